@@ -1,33 +1,107 @@
 from typing import Generator, Optional
+import hashlib
+import logging
+import threading
+import time
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.database import User
+from app.models.database import User, File as DBFile
 from app.core.security import verify_token
 
+logger = logging.getLogger(__name__)
+
 # HTTP Bearer for token extraction
 security = HTTPBearer()
 
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db)
-) -> User:
+# Prebuilt lookups for the hottest queries; bound parameters keep their compiled form cacheable
+USER_BY_ID_STMT = select(User).where(User.id == bindparam("uid"))
+FILE_BY_OWNER_STMT = select(DBFile).where(
+    DBFile.file_id == bindparam("fid"),
+    DBFile.user_id == bindparam("uid")
+)
+
+# Verified access-token payloads keyed by a SHA-256 digest of the token (raw tokens are never stored)
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+_token_cache_lock = threading.Lock()
+
+# Authenticated users keyed by user id, detached from the session that loaded them
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+_user_cache_lock = threading.Lock()
+
+# Confirmed (user id, file id) ownership pairs; ownership never moves, only deletion ends it
+_owner_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+_owner_cache_lock = threading.Lock()
+
+def _verify_access_token_cached(access_token: str) -> Optional[dict]:
+    """
+    Verify an access token, skipping the signature check for recently verified tokens
+    """
+    key = hashlib.sha256(access_token.encode()).hexdigest()[:32]
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    
+    if cached is not None:
+        payload, exp = cached
+        # Expiry is the only claim that can change between hits
+        if exp > time.time():
+            return payload
+        with _token_cache_lock:
+            _token_cache.pop(key, None)
+        return None
+    
+    payload = verify_token(access_token, token_type="access")
+    if payload is not None:
+        with _token_cache_lock:
+            _token_cache[key] = (payload, payload.get("exp", 0))
+    return payload
+
+def invalidate_user_cache(user_id) -> None:
+    """
+    Drop a cached user so the next request reloads it from the database
+    """
+    with _user_cache_lock:
+        _user_cache.pop(str(user_id), None)
+
+def remember_file_owner(user_id, file_id: str) -> None:
+    """
+    Record that a file belongs to a user (e.g. right after upload)
     """
-    Get current authenticated user from Authorization header OR HTTP-only cookie
+    with _owner_cache_lock:
+        _owner_cache[(str(user_id), file_id)] = True
+
+def forget_file_owner(user_id, file_id: str) -> None:
     """
-    # Try Authorization header first (for development)
-    auth_header = request.headers.get("Authorization")
-    access_token = None
+    Drop a cached ownership pair once the file is deleted
+    """
+    with _owner_cache_lock:
+        _owner_cache.pop((str(user_id), file_id), None)
+
+def _get_request_token(request: Request) -> Optional[str]:
+    """
+    Extract the access token from the HTTP-only cookie OR Authorization header
+    """
+    # Try HTTP-only cookie first (for production)
+    access_token = request.cookies.get("access_token")
     
-    if auth_header and auth_header.startswith("Bearer "):
-        access_token = auth_header.split(" ")[1]
-        print(f"DEBUG: Token from Authorization header")
+    if access_token:
+        logger.debug("Token from cookie")
     else:
-        # Fall back to cookie (for production)
-        access_token = request.cookies.get("access_token")
-        print(f"DEBUG: Token from cookie: {access_token[:20] if access_token else 'None'}...")
+        # Fall back to Authorization header (for development)
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            access_token = auth_header[7:]
+            logger.debug("Token from Authorization header")
     
+    return access_token
+
+def _authenticate(access_token: Optional[str], db: Session) -> User:
+    """
+    Resolve an access token to an active user
+    """
     if not access_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,8 +109,8 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify token
-    payload = verify_token(access_token, token_type="access")
+    # Verify token (cached)
+    payload = _verify_access_token_cached(access_token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,21 +118,24 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # "sub" is guaranteed by verify_token
+    user_id: str = payload["sub"]
+    
+    # Get user from cache, falling back to the database
+    with _user_cache_lock:
+        user = _user_cache.get(user_id)
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+        user = db.execute(USER_BY_ID_STMT, {"uid": user_id}).scalars().first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        # Detach so the instance can outlive this request's session
+        db.expunge(user)
+        with _user_cache_lock:
+            _user_cache[user_id] = user
     
     if not user.is_active:
         raise HTTPException(
@@ -68,12 +145,75 @@ def get_current_user(
     
     return user
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db)
 ) -> User:
     """
-    Get current active user
+    Get current authenticated user from HTTP-only cookie OR Authorization header
+    """
+    return _authenticate(_get_request_token(request), db)
+
+def get_current_user_flexible(
+    request: Request,
+    token: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Get current authenticated user, also accepting the token as a query parameter (browser downloads)
+    """
+    return _authenticate(token or _get_request_token(request), db)
+
+def verify_file_owner(
+    file_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> DBFile:
+    """
+    Get the requested file, raising 404 unless it belongs to the current user
     """
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
+    db_file = db.execute(
+        FILE_BY_OWNER_STMT, {"fid": file_id, "uid": current_user.id}
+    ).scalars().first()
+    
+    if not db_file:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return db_file
+
+def require_file_owner(
+    file_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> None:
+    """
+    Ensure the requested file belongs to the current user without loading it;
+    recently confirmed pairs skip the database
+    """
+    key = (str(current_user.id), file_id)
+    with _owner_cache_lock:
+        if key in _owner_cache:
+            return
+    
+    verify_file_owner(file_id, current_user, db)
+    with _owner_cache_lock:
+        _owner_cache[key] = True
+
+def require_file_owner_flexible(
+    file_id: str,
+    current_user: User = Depends(get_current_user_flexible),
+    db: Session = Depends(get_db)
+) -> None:
+    """
+    Same as require_file_owner, also accepting the token as a query parameter (browser downloads)
+    """
+    require_file_owner(file_id, current_user, db)
+
+def get_preprocessor(request: Request):
+    """
+    Get the DataPreprocessor built at startup and shared through app.state
+    """
+    return request.app.state.preprocessor
+
+# get_current_user already rejects inactive users; keep the old name as an alias
+get_current_active_user = get_current_user
@@ -1,47 +1,47 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from anyio import to_thread
 from app.models.schemas import AnalysisResponse
-from app.models.database import User, File as DBFile
 from app.services.data_analyzer import DataAnalyzer
-from app.database import get_db
-from app.api.dependencies import get_current_user
-import json
+from app.api.dependencies import require_file_owner
+from functools import lru_cache
+import orjson
 import os
 
 router = APIRouter()
 analyzer = DataAnalyzer()
+metadata_dir = "temp/metadata"
 
-@router.get("/analyze/{file_id}", response_model=AnalysisResponse)
+@lru_cache(maxsize=1024)
+def _read_failed_columns(metadata_file: str, mtime_ns: int) -> frozenset:
+    """Parse the failed-columns metadata; mtime_ns busts the cache when it is rewritten"""
+    with open(metadata_file, 'rb') as f:
+        data = orjson.loads(f.read())
+    return frozenset(data.get('failed_skewness_columns', []))
+
+def _load_failed_columns(file_id: str) -> frozenset:
+    """Load previously failed skewness columns for this file"""
+    metadata_file = os.path.join(metadata_dir, f"{file_id}_failed_columns.json")
+    try:
+        mtime_ns = os.stat(metadata_file).st_mtime_ns
+    except FileNotFoundError:
+        return frozenset()
+    
+    try:
+        return _read_failed_columns(metadata_file, mtime_ns)
+    except Exception as e:
+        print(f"Warning: Could not load failed columns metadata: {e}")
+        return frozenset()
+
+@router.get("/analyze/{file_id}", response_model=AnalysisResponse, dependencies=[Depends(require_file_owner)])
 async def analyze_file(
-    file_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    file_id: str
 ):
     """
     Analyze uploaded file for data quality issues (requires authentication)
     """
-    # Verify file belongs to user
-    db_file = db.query(DBFile).filter(
-        DBFile.file_id == file_id,
-        DBFile.user_id == current_user.id
-    ).first()
-    
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
-    
     try:
         # Load failed columns metadata if it exists
-        metadata_dir = "temp/metadata"
-        metadata_file = os.path.join(metadata_dir, f"{file_id}_failed_columns.json")
-        exclude_skewness_columns = set()
-        
-        if os.path.exists(metadata_file):
-            try:
-                with open(metadata_file, 'r') as f:
-                    data = json.load(f)
-                    exclude_skewness_columns = set(data.get('failed_skewness_columns', []))
-            except Exception as e:
-                print(f"Warning: Could not load failed columns metadata: {e}")
+        exclude_skewness_columns = _load_failed_columns(file_id)
         
         analysis_result = await analyzer.analyze_dataset(file_id, exclude_skewness_columns=exclude_skewness_columns)
         return analysis_result
@@ -50,10 +50,13 @@ async def analyze_file(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing file: {str(e)}")
 
-@router.get("/analyze/{file_id}/preview")
-async def preview_data(file_id: str, rows: int = 10):
+@router.get("/analyze/{file_id}/preview", dependencies=[Depends(require_file_owner)])
+async def preview_data(
+    file_id: str,
+    rows: int = 10
+):
     """
-    Get a preview of the dataset
+    Get a preview of the dataset (requires authentication)
     """
     try:
         preview = await analyzer.get_data_preview(file_id, rows)
@@ -63,33 +66,40 @@ async def preview_data(file_id: str, rows: int = 10):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting preview: {str(e)}")
 
-@router.get("/analyze/{file_id}/info")
-async def get_data_info(file_id: str):
+@lru_cache(maxsize=256)
+def _compute_data_info(file_id: str, mtime: float, include_duplicates: bool) -> dict:
+    """Compute dataset info; keyed by mtime so rewritten files are recomputed"""
+    df = analyzer.file_handler.load_dataframe(file_id)
+    null_counts = df.isnull().sum()
+    
+    return {
+        "shape": df.shape,
+        "columns": df.columns.tolist(),
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "null_counts": {col: int(count) for col, count in null_counts.items() if count > 0},
+        "total_nulls": int(null_counts.sum()),
+        # Hashing every row is the heaviest step, so it can be skipped
+        "duplicate_rows": int(df.duplicated().sum()) if include_duplicates else None,
+        "memory_usage": int(df.memory_usage(deep=True).sum()),
+        "numeric_columns": df.select_dtypes(include=['number']).columns.tolist(),
+        "object_columns": df.select_dtypes(include=['object']).columns.tolist(),
+        "sample_data": df.head(3).to_dict(orient='records')
+    }
+
+@router.get("/analyze/{file_id}/info", dependencies=[Depends(require_file_owner)])
+async def get_data_info(
+    file_id: str,
+    include_duplicates: bool = True
+):
     """
-    Get detailed information about the dataset for debugging
+    Get detailed information about the dataset for debugging (requires authentication)
     """
     try:
-        from app.services.file_handler import FileHandler
-        import pandas as pd
-        
-        file_handler = FileHandler()
-        df = file_handler.load_dataframe(file_id)
-        
-        # Get comprehensive data info
-        info = {
-            "shape": df.shape,
-            "columns": df.columns.tolist(),
-            "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
-            "null_counts": {col: int(count) for col, count in df.isnull().sum().items() if count > 0},
-            "total_nulls": int(df.isnull().sum().sum()),
-            "duplicate_rows": int(df.duplicated().sum()),
-            "memory_usage": df.memory_usage(deep=True).sum(),
-            "numeric_columns": df.select_dtypes(include=['number']).columns.tolist(),
-            "object_columns": df.select_dtypes(include=['object']).columns.tolist(),
-            "sample_data": df.head(3).to_dict(orient='records')
-        }
-        
-        return info
+        file_path = analyzer.file_handler.get_current_file_path(file_id)
+        # Loading and scanning the frame blocks, so keep it off the event loop
+        return await to_thread.run_sync(
+            _compute_data_info, file_id, os.path.getmtime(file_path), include_duplicates
+        )
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
     except Exception as e:
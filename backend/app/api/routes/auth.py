@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
+from sqlalchemy import select, update, or_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 from datetime import timedelta, datetime
+import logging
+from anyio import to_thread
 from app.database import get_db
 from app.models.database import User, OTP
 from app.core.security import (
@@ -11,11 +14,31 @@ from app.core.security import (
     create_refresh_token,
     verify_token
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, invalidate_user_cache, USER_BY_ID_STMT
 from app.services.email_service import send_otp_email, generate_otp
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
+# Shared cookie settings so every endpoint sets identical cookies
+ACCESS_COOKIE_OPTS = dict(
+    key="access_token",
+    httponly=True,
+    secure=False,  # Set to True in production with HTTPS
+    samesite="lax",
+    path="/",
+    max_age=60 * 15  # 15 minutes
+)
+REFRESH_COOKIE_OPTS = dict(
+    key="refresh_token",
+    httponly=True,
+    secure=False,  # Set to True in production with HTTPS
+    samesite="lax",
+    path="/",
+    max_age=60 * 60 * 24 * 7  # 7 days
+)
+
 # Request/Response Models
 class SignupRequest(BaseModel):
     email: EmailStr
@@ -44,28 +67,39 @@ async def signup(
     db: Session = Depends(get_db)
 ):
     """Register a new user and send OTP for email verification"""
-    # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
-        if existing_user.is_verified:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        # User exists but not verified - resend OTP
-        db.delete(existing_user)
-        db.commit()
+    # Check email and username in one round-trip
+    existing_users = db.execute(
+        select(User).where(
+            or_(User.email == user_data.email, User.username == user_data.username)
+        )
+    ).scalars().all()
+    existing_user = next((u for u in existing_users if u.email == user_data.email), None)
+    existing_username = next(
+        (u for u in existing_users if u.username == user_data.username and u is not existing_user),
+        None
+    )
+    
+    if existing_user and existing_user.is_verified:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
-    # Check if username already exists
-    existing_username = db.query(User).filter(User.username == user_data.username).first()
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
+    if existing_user:
+        # User exists but not verified - resend OTP
+        invalidate_user_cache(existing_user.id)
+        db.delete(existing_user)
+        db.commit()
+    
     # Create new user (inactive until verified)
-    hashed_password = get_password_hash(user_data.password)
+    # bcrypt is CPU-bound; hash in a worker thread to keep the event loop free
+    hashed_password = await to_thread.run_sync(get_password_hash, user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -113,67 +147,63 @@ async def verify_otp(
     db: Session = Depends(get_db)
 ):
     """Verify OTP and activate user account"""
-    # Find user
-    user = db.query(User).filter(User.email == otp_data.email).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+    # Consume a valid OTP for an unverified user in one statement
+    unverified_user_id = select(User.id).where(
+        User.email == otp_data.email,
+        User.is_verified == False
+    ).scalar_subquery()
+    
+    user_id = db.execute(
+        update(OTP)
+        .where(
+            OTP.user_id == unverified_user_id,
+            OTP.code == otp_data.otp,
+            OTP.is_used == False,
+            OTP.expires_at > datetime.utcnow()
         )
-    
-    if user.is_verified:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already verified"
-        )
-    
-    # Find valid OTP
-    otp = db.query(OTP).filter(
-        OTP.user_id == user.id,
-        OTP.code == otp_data.otp,
-        OTP.is_used == False,
-        OTP.expires_at > datetime.utcnow()
-    ).first()
-    
-    if not otp:
+        .values(is_used=True)
+        .returning(OTP.user_id)
+    ).scalars().first()
+    
+    if user_id is None:
+        db.rollback()
+        # Slow path: work out which check failed
+        user = db.query(User).filter(User.email == otp_data.email).first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        if user.is_verified:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already verified"
+            )
+        
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired OTP"
         )
     
-    # Mark OTP as used
-    otp.is_used = True
-    
     # Activate user
-    user.is_active = True
-    user.is_verified = True
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(is_active=True, is_verified=True)
+    )
     
     db.commit()
+    invalidate_user_cache(user_id)
     
     # Auto-login after verification
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data={"sub": str(user_id)})
+    refresh_token = create_refresh_token(data={"sub": str(user_id)})
     
     # Set cookies
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=False,
-        samesite="lax",
-        path="/",
-        max_age=60 * 15
-    )
+    response.set_cookie(value=access_token, **ACCESS_COOKIE_OPTS)
     
-    response.set_cookie(
-        key="refresh_token",
-        value=refresh_token,
-        httponly=True,
-        secure=False,
-        samesite="lax",
-        path="/",
-        max_age=60 * 60 * 24 * 7
-    )
+    response.set_cookie(value=refresh_token, **REFRESH_COOKIE_OPTS)
     
     return {
         "message": "Email verified successfully",
@@ -193,7 +223,12 @@ async def login(
     # Find user by email
     user = db.query(User).filter(User.email == credentials.email).first()
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    # bcrypt is CPU-bound; verify in a worker thread to keep the event loop free
+    password_ok = user is not None and await to_thread.run_sync(
+        verify_password, credentials.password, user.hashed_password
+    )
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -210,28 +245,12 @@ async def login(
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
-    print(f"DEBUG LOGIN: Setting cookies for user {user.email}")
+    logger.debug("Setting login cookies for user %s", user.email)
     
     # Set HTTP-only cookies (for production with proxy/same domain)
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=False,
-        samesite="lax",
-        path="/",
-        max_age=60 * 15
-    )
+    response.set_cookie(value=access_token, **ACCESS_COOKIE_OPTS)
     
-    response.set_cookie(
-        key="refresh_token",
-        value=refresh_token,
-        httponly=True,
-        secure=False,
-        samesite="lax",
-        path="/",
-        max_age=60 * 60 * 24 * 7
-    )
+    response.set_cookie(value=refresh_token, **REFRESH_COOKIE_OPTS)
     
     # ALSO return tokens in response body for development (different ports)
     return {
@@ -264,15 +283,10 @@ async def refresh_token_endpoint(
             detail="Invalid refresh token"
         )
     
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload"
-        )
+    user_id = payload["sub"]
     
     # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.execute(USER_BY_ID_STMT, {"uid": user_id}).scalars().first()
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -283,21 +297,19 @@ async def refresh_token_endpoint(
     new_access_token = create_access_token(data={"sub": str(user.id)})
     
     # Set new access token cookie
-    response.set_cookie(
-        key="access_token",
-        value=new_access_token,
-        httponly=True,
-        secure=False,  # Set to True in production with HTTPS
-        samesite="lax",
-        path="/",
-        max_age=60 * 15  # 15 minutes
-    )
+    response.set_cookie(value=new_access_token, **ACCESS_COOKIE_OPTS)
     
     return {"message": "Token refreshed successfully"}
 
 @router.post("/logout", response_model=MessageResponse)
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
     """Logout user by clearing cookies"""
+    access_token = request.cookies.get("access_token")
+    if access_token:
+        payload = verify_token(access_token, token_type="access")
+        if payload:
+            invalidate_user_cache(payload["sub"])
+    
     response.delete_cookie(key="access_token", path="/")
     response.delete_cookie(key="refresh_token", path="/")
     return {"message": "Logout successful"}
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends
+from anyio import to_thread
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
 from app.models.database import User, File as DBFile
 from app.database import get_db
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, verify_file_owner, forget_file_owner
+from app.services.file_handler import FileHandler
 from pydantic import BaseModel
 from datetime import datetime
 
 router = APIRouter(prefix="/api/files", tags=["files"])
+file_handler = FileHandler()
 
 class FileResponse(BaseModel):
     id: str
@@ -27,58 +31,50 @@ async def get_user_files(
     db: Session = Depends(get_db)
 ):
     """Get all files for the current user"""
-    files = db.query(DBFile).filter(
-        DBFile.user_id == current_user.id
-    ).order_by(DBFile.uploaded_at.desc()).all()
+    # Select only the response columns; skips full ORM entity hydration
+    rows = db.execute(
+        select(
+            DBFile.id,
+            DBFile.file_id,
+            DBFile.filename,
+            DBFile.file_size,
+            DBFile.file_type,
+            DBFile.status,
+            DBFile.uploaded_at
+        )
+        .where(DBFile.user_id == current_user.id)
+        .order_by(DBFile.uploaded_at.desc())
+    ).all()
     
     return [
         FileResponse(
-            id=str(file.id),
-            file_id=file.file_id,
-            filename=file.filename,
-            file_size=file.file_size,
-            file_type=file.file_type,
-            status=file.status,
-            uploaded_at=file.uploaded_at
+            id=str(row.id),
+            file_id=row.file_id,
+            filename=row.filename,
+            file_size=row.file_size,
+            file_type=row.file_type,
+            status=row.status,
+            uploaded_at=row.uploaded_at
         )
-        for file in files
+        for row in rows
     ]
 
 @router.delete("/{file_id}")
 async def delete_file(
     file_id: str,
-    current_user: User = Depends(get_current_user),
+    db_file: DBFile = Depends(verify_file_owner),
     db: Session = Depends(get_db)
 ):
     """Delete a file"""
-    import os
-    from app.services.file_handler import FileHandler
-    
-    # Find file in database
-    db_file = db.query(DBFile).filter(
-        DBFile.file_id == file_id,
-        DBFile.user_id == current_user.id
-    ).first()
-    
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # Delete physical file
-    file_handler = FileHandler()
+    # Delete physical files
     try:
-        file_path = file_handler.get_file_path(file_id)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Delete processed file if exists
-        processed_path = file_handler.get_processed_file_path(file_id)
-        if os.path.exists(processed_path):
-            os.remove(processed_path)
-    except Exception as e:
+        await file_handler.delete_file(file_id)
+    except OSError as e:
         print(f"Error deleting physical file: {e}")
     
     # Delete from database
+    forget_file_owner(db_file.user_id, file_id)
     db.delete(db_file)
-    db.commit()
+    await to_thread.run_sync(db.commit)
     
     return {"message": "File deleted successfully"}
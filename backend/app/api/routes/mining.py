@@ -1,15 +1,17 @@
 from fastapi import APIRouter, HTTPException, Depends
+from anyio import to_thread
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from app.models.database import User, File as DBFile
+from app.models.database import User
 from app.database import get_db
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, require_file_owner
 from app.services.data_mining import DataMiningService
 from app.services.file_handler import FileHandler
 import os
 
 router = APIRouter(prefix="/api/mining", tags=["data-mining"])
+file_handler = FileHandler()
 
 
 class MiningRequest(BaseModel):
@@ -25,24 +27,12 @@ class MiningResponse(BaseModel):
     columns_used: List[str]
 
 
-@router.get("/columns/{file_id}")
+@router.get("/columns/{file_id}", dependencies=[Depends(require_file_owner)])
 async def get_file_columns(
-    file_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    file_id: str
 ):
     """Get column information for a file"""
-    # Verify file ownership
-    db_file = db.query(DBFile).filter(
-        DBFile.file_id == file_id,
-        DBFile.user_id == current_user.id
-    ).first()
-    
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
-    
     # Get file path
-    file_handler = FileHandler()
     file_path = file_handler._get_file_path(file_id)
     
     if not os.path.exists(file_path):
@@ -64,23 +54,17 @@ async def analyze_data(
 ):
     """Perform data mining analysis"""
     # Verify file ownership
-    db_file = db.query(DBFile).filter(
-        DBFile.file_id == request.file_id,
-        DBFile.user_id == current_user.id
-    ).first()
-    
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
+    await to_thread.run_sync(require_file_owner, request.file_id, current_user, db)
     
     # Get file path
-    file_handler = FileHandler()
     file_path = file_handler._get_file_path(request.file_id)
     
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="File not found on disk")
     
     try:
-        mining_service = DataMiningService(file_path)
+        # Every analysis only touches the requested columns
+        mining_service = DataMiningService(file_path, columns=request.columns)
         
         # Perform analysis based on type
         if request.analytics_type == "correlation":
@@ -1,38 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
+from anyio import to_thread
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.models.schemas import PreprocessRequest, PreprocessResponse
-from app.models.database import User, File as DBFile
-from app.services.data_preprocessor import DataPreprocessor
-from app.database import get_db
-from app.api.dependencies import get_current_user
+from typing import Optional
+from app.models.schemas import PreprocessRequest, PreprocessResponse, ImbalancedDataRequest
+from app.models.database import User
+from app.api.dependencies import get_current_user, get_preprocessor, require_file_owner, require_file_owner_flexible
+from app.core.config import settings
+import orjson
+import uuid
+import time
+import os
 
 router = APIRouter()
-preprocessor = DataPreprocessor()
+jobs_dir = "temp/jobs"
+os.makedirs(jobs_dir, exist_ok=True)
 
-class ImbalancedDataRequest(BaseModel):
-    target_column: str
-    method: str  # smote, oversample, or undersample
-
-@router.post("/preprocess/{file_id}", response_model=PreprocessResponse)
+@router.post("/preprocess/{file_id}", response_model=PreprocessResponse, dependencies=[Depends(require_file_owner)])
 async def preprocess_file(
     file_id: str,
     request: PreprocessRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    preprocessor=Depends(get_preprocessor)
 ):
     """
     Apply preprocessing actions to the dataset (requires authentication)
     """
-    # Verify file belongs to user
-    db_file = db.query(DBFile).filter(
-        DBFile.file_id == file_id,
-        DBFile.user_id == current_user.id
-    ).first()
-    
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
     try:
         result = await preprocessor.preprocess_dataset(file_id, request.actions)
         return result
@@ -43,57 +34,21 @@ async def preprocess_file(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error preprocessing file: {str(e)}")
 
-@router.get("/download/{file_id}")
+@router.get("/download/{file_id}", dependencies=[Depends(require_file_owner_flexible)])
 async def download_file(
     file_id: str,
-    token: str = None,  # Accept token from query parameter
-    request: Request = None,
-    db: Session = Depends(get_db)
+    preprocessor=Depends(get_preprocessor)
 ):
     """
     Download the processed dataset
     Accepts token from query parameter for browser downloads
     """
-    # Get user from token (query param or header)
-    from app.api.dependencies import get_current_user
-    from app.core.security import verify_token
-    from app.models.database import User
-    
-    # Try to get token from query parameter first (for downloads)
-    access_token = token
-    if not access_token and request:
-        # Fall back to header
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            access_token = auth_header.split(" ")[1]
-    
-    if not access_token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    # Verify token and get user
-    payload = verify_token(access_token, token_type="access")
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    
-    user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    # Verify file belongs to user
-    from app.models.database import File as DBFile
-    db_file = db.query(DBFile).filter(
-        DBFile.file_id == file_id,
-        DBFile.user_id == user.id
-    ).first()
-    
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
     try:
-        # get_processed_file_path is synchronous, don't await it
-        file_path = preprocessor.file_handler.get_processed_file_path(file_id)
+        # Stat once and hand the result over so Starlette doesn't stat again
+        file_path, stat_result = preprocessor.file_handler.stat_processed_file(file_id)
         return FileResponse(
             path=file_path,
+            stat_result=stat_result,
             media_type="application/octet-stream",
             filename=f"processed_{file_id}.csv"
         )
@@ -102,8 +57,11 @@ async def download_file(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error downloading file: {str(e)}")
 
-@router.post("/preprocess/{file_id}/fix-all")
-async def fix_all_issues(file_id: str):
+@router.post("/preprocess/{file_id}/fix-all", dependencies=[Depends(require_file_owner)])
+async def fix_all_issues(
+    file_id: str,
+    preprocessor=Depends(get_preprocessor)
+):
     """
     Automatically apply recommended fixes for all detected issues
     """
@@ -115,52 +73,168 @@ async def fix_all_issues(file_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fixing issues: {str(e)}")
 
-@router.post("/preprocess/{file_id}/fix-imbalanced")
-async def fix_imbalanced_data(file_id: str, request: ImbalancedDataRequest):
+def _job_path(job_id: str) -> str:
+    """Get job state file path"""
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+def _write_job(job: dict):
+    """Persist job state on disk so any worker process can answer polls"""
+    # Stamped on the first write, so polls can tell a job whose worker died from a slow one
+    job.setdefault("started_at", time.time())
+    path = _job_path(job["job_id"])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(job))
+    os.replace(tmp_path, path)
+
+def _read_job(job_id: str) -> Optional[dict]:
+    """Load job state, or None if the job is unknown"""
+    try:
+        with open(_job_path(job_id), 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _job_timed_out(job: dict) -> bool:
     """
-    Fix imbalanced data using selected sampling method, then auto-fix any new issues
+    Whether an unfinished job has outlived JOB_TIMEOUT_SECONDS. Job state only lives on disk, so a
+    task killed with its worker (restart, OOM) never finishes; such jobs are reported failed
     """
+    age = time.time() - job.get("started_at", time.time())
+    return job["status"] in ("queued", "running") and age > settings.JOB_TIMEOUT_SECONDS
+
+class JobTimedOut(Exception):
+    """Raised in a job's worker once polls already report the job as failed"""
+
+def _ensure_job_active(job: dict):
+    """Stop a job's worker before it writes anything the client was told never arrived"""
+    if _job_timed_out(job):
+        raise JobTimedOut(job["job_id"])
+
+def _sweep_jobs():
+    """Delete job files older than the retention period, including jobs nobody polled"""
+    cutoff = time.time() - settings.JOB_RETENTION_SECONDS
+    with os.scandir(jobs_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+def _run_fix_imbalanced(preprocessor, job: dict, target_column: str, method: str):
+    """Resample, save and auto-fix in a worker thread, recording progress on the job"""
+    file_id = job["file_id"]
     try:
+        # Queued past the timeout (e.g. behind a long backlog): already reported failed
+        _ensure_job_active(job)
+        job["status"] = "running"
+        _write_job(job)
+        
         print(f"\n=== FIXING IMBALANCED DATA ===")
-        print(f"Method: {request.method}, Target: {request.target_column}")
+        print(f"Method: {method}, Target: {target_column}")
         
         # Load the DataFrame (NOT async)
         df = preprocessor.file_handler.load_dataframe(file_id)
         original_rows = len(df)
         
         # Apply imbalanced data handling
-        df_processed = preprocessor._handle_imbalanced_data(
-            df, 
-            request.target_column, 
-            request.method
-        )
+        df_processed = preprocessor._handle_imbalanced_data(df, target_column, method)
         
         # Save the processed file (NOT async) - returns PATH, not file_id!
-        processed_path = preprocessor.file_handler.save_processed_dataframe(
-            file_id,
-            df_processed
-        )
+        _ensure_job_active(job)
+        preprocessor.file_handler.save_processed_dataframe(file_id, df_processed)
         
         print(f"✓ Imbalanced data fixed: {original_rows} → {len(df_processed)} rows")
         print(f"\n=== AUTO-FIXING NEW ISSUES CREATED BY SAMPLING ===")
         
         # Automatically run fix_all_issues to clean up any new issues created by sampling
         # (e.g., duplicates, outliers, skewness from synthetic data)
-        auto_fix_result = await preprocessor.fix_all_issues(file_id)
+        auto_fix_result = preprocessor.fix_all_issues_sync(file_id, before_save=lambda: _ensure_job_active(job))
         
         print(f"✓ Auto-fix complete: {auto_fix_result.summary['actions_applied']} actions applied")
         print(f"=== IMBALANCED DATA FIX COMPLETE ===\n")
         
-        return {
+        _ensure_job_active(job)
+        job["status"] = "completed"
+        job["result"] = {
             "file_id": file_id,
             "status": "success",
-            "message": f"Applied {request.method} and auto-fixed resulting issues",
+            "message": f"Applied {method} and auto-fixed resulting issues",
             "original_rows": original_rows,
             "processed_rows": auto_fix_result.processed_rows,
             "actions_applied": auto_fix_result.summary['actions_applied'],
             "remaining_issues": auto_fix_result.summary['remaining_issues']
         }
+    except JobTimedOut:
+        # Polls report the job failed; leave the processed file and job state as they are
+        print(f"✗ Job {job['job_id']} timed out; discarding its results")
+        return
     except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="File not found")
+        job["status"] = "failed"
+        job["error"] = "File not found"
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fixing imbalanced data: {str(e)}")
+        job["status"] = "failed"
+        job["error"] = f"Error fixing imbalanced data: {str(e)}"
+    
+    _write_job(job)
+
+@router.post(
+    "/preprocess/{file_id}/fix-imbalanced",
+    status_code=202,
+    dependencies=[Depends(require_file_owner)]
+)
+async def fix_imbalanced_data(
+    file_id: str,
+    request: ImbalancedDataRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    preprocessor=Depends(get_preprocessor)
+):
+    """
+    Queue an imbalanced data fix (sampling, then auto-fix of any new issues).
+    Sampling can take minutes, so poll GET /preprocess/jobs/{job_id} for the result.
+    """
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "file_id": file_id,
+        "user_id": str(current_user.id),
+        "status": "queued",
+        "result": None,
+        "error": None
+    }
+    _write_job(job)
+    await to_thread.run_sync(_sweep_jobs)
+    
+    # Sync task, so Starlette runs it in the threadpool after the response is sent
+    background_tasks.add_task(
+        _run_fix_imbalanced, preprocessor, job, request.target_column, request.method
+    )
+    
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+@router.get("/preprocess/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the status and result of a background preprocessing job
+    """
+    job = await to_thread.run_sync(_read_job, job_id)
+    if job is None or job["user_id"] != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Report a stalled job failed instead of leaving the client polling; finished jobs stay
+    # readable until _sweep_jobs removes them by age
+    if _job_timed_out(job):
+        job["status"] = "failed"
+        job["error"] = "Job timed out; the worker running it may have stopped. Please try again."
+    
+    return {
+        "job_id": job["job_id"],
+        "file_id": job["file_id"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"]
+    }
@@ -1,17 +1,27 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from anyio import to_thread
 from sqlalchemy.orm import Session
 from app.models.schemas import FileInfo
 from app.models.database import User, File as DBFile
 from app.services.file_handler import FileHandler
 from app.core.config import settings
 from app.database import get_db
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, verify_file_owner, remember_file_owner, forget_file_owner
+import aiofiles
 import uuid
 import os
 
 router = APIRouter()
 file_handler = FileHandler()
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Settings are fixed for the process lifetime, so derive the validation constants once
+ALLOWED_EXTENSIONS = frozenset(settings.ALLOWED_EXTENSIONS)
+EXTENSION_ERROR = f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+MAX_UPLOAD_SIZE = settings.MAX_UPLOAD_SIZE
+SIZE_ERROR = f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / (1024*1024)}MB"
+
 @router.post("/upload", response_model=FileInfo)
 async def upload_file(
     file: UploadFile = File(...),
@@ -23,42 +33,52 @@ async def upload_file(
     """
     # Validate file extension
     file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in settings.ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
-        )
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=EXTENSION_ERROR)
     
-    # Validate file size
-    contents = await file.read()
-    if len(contents) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / (1024*1024)}MB"
-        )
+    # Generate unique file ID; extension, type and path are derived once and reused below
+    file_id = str(uuid.uuid4())
+    file_type = file_ext[1:]  # Remove the dot
+    file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}{file_ext}")
     
-    # Reset file pointer
-    await file.seek(0)
+    # Stream to disk in 1 MiB chunks, enforcing the size limit as we go
+    file_size = 0
+    try:
+        async with aiofiles.open(file_path, 'wb') as out_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_UPLOAD_SIZE:
+                    break
+                await out_file.write(chunk)
+    except BaseException:
+        # Failed or cancelled mid-stream: don't leave a truncated file in the upload directory
+        if os.path.exists(file_path):
+            os.unlink(file_path)
+        raise
     
-    # Generate unique file ID
-    file_id = str(uuid.uuid4())
+    if file_size > MAX_UPLOAD_SIZE:
+        os.unlink(file_path)
+        raise HTTPException(status_code=413, detail=SIZE_ERROR)
     
     try:
-        # Save and process file
-        file_info = await file_handler.save_uploaded_file(file, file_id)
+        # Process saved file
+        file_info = await file_handler.describe_uploaded_file(
+            file_path, file_id, file.filename, file_type, file_size
+        )
         
         # Save file metadata to database
         db_file = DBFile(
             user_id=current_user.id,
             file_id=file_id,
             filename=file.filename,
-            file_path=os.path.join(settings.UPLOAD_DIR, f"{file_id}{file_ext}"),
-            file_size=len(contents),
-            file_type=file_ext[1:],  # Remove the dot
+            file_path=file_path,
+            file_size=file_size,
+            file_type=file_type,
             status="uploaded"
         )
         db.add(db_file)
-        db.commit()
+        await to_thread.run_sync(db.commit)
+        remember_file_owner(current_user.id, file_id)
         
         return file_info
     except Exception as e:
@@ -68,25 +88,17 @@ async def upload_file(
 @router.delete("/upload/{file_id}")
 async def delete_file(
     file_id: str,
-    current_user: User = Depends(get_current_user),
+    db_file: DBFile = Depends(verify_file_owner),
     db: Session = Depends(get_db)
 ):
     """
     Delete an uploaded file (requires authentication)
     """
-    # Verify file belongs to user
-    db_file = db.query(DBFile).filter(
-        DBFile.file_id == file_id,
-        DBFile.user_id == current_user.id
-    ).first()
-    
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
-    
     try:
         await file_handler.delete_file(file_id)
+        forget_file_owner(db_file.user_id, file_id)
         db.delete(db_file)
-        db.commit()
+        await to_thread.run_sync(db.commit)
         return {"message": "File deleted successfully"}
     except Exception as e:
         db.rollback()
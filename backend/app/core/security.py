@@ -39,9 +39,14 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
-    """Verify and decode JWT token"""
+    """Verify and decode JWT token in a single pass (signature, exp and sub are all checked here)"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+            options={"require_exp": True, "require_sub": True}
+        )
         if payload.get("type") != token_type:
             return None
         return payload
@@ -1,3 +1,4 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -13,12 +14,23 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Same pool, but connections checked out through it run READ COMMITTED, read-only transactions
+read_only_engine = engine.execution_options(
+    isolation_level="READ COMMITTED",
+    postgresql_readonly=True
+) if engine.dialect.name == "postgresql" else engine
+
 # Create Base class for models
 Base = declarative_base()
 
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request = None):
+    # GET handlers only read: bind them to the read-only engine. The connection is still only
+    # checked out on first use, so requests answered from cache never touch the pool
+    if request is not None and request.method == "GET":
+        db = SessionLocal(bind=read_only_engine)
+    else:
+        db = SessionLocal()
     try:
         yield db
     finally:
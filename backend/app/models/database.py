@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -23,6 +23,10 @@ class User(Base):
 
 class OTP(Base):
     __tablename__ = "otps"
+    __table_args__ = (
+        # verify-otp looks codes up per user
+        Index("ix_otp_user_code", "user_id", "code"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -36,6 +40,11 @@ class OTP(Base):
 
 class File(Base):
     __tablename__ = "files"
+    __table_args__ = (
+        # Ownership checks filter on both columns; listing filters on user_id alone
+        Index("ix_file_user", "file_id", "user_id", unique=True),
+        Index("ix_file_owner_uploaded", "user_id", "uploaded_at"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
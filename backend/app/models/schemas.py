@@ -59,6 +59,10 @@ class PreprocessAction(BaseModel):
 class PreprocessRequest(BaseModel):
     actions: List[PreprocessAction]
 
+class ImbalancedDataRequest(BaseModel):
+    target_column: str
+    method: str  # smote, oversample, or undersample
+
 class PreprocessResponse(BaseModel):
     file_id: str
     original_rows: int
@@ -0,0 +1,196 @@
+import warnings
+import numpy as np
+import pandas as pd
+from functools import cached_property
+from typing import Optional, Tuple
+
+
+def numeric_matrix(df: pd.DataFrame) -> Tuple[pd.Index, np.ndarray]:
+    """Return numeric column names and their values as one contiguous float64 matrix (NaN for missing)"""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    mat = np.ascontiguousarray(
+        df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    )
+    return numeric_cols, mat
+
+
+class ColumnProfile:
+    """Column groupings and per-column scans of a DataFrame, computed once per analysis and shared by every check"""
+    
+    def __init__(self, df: pd.DataFrame):
+        self.numeric_cols, self.num_mat = numeric_matrix(df)
+        self.object_cols = df.select_dtypes(include=['object']).columns
+        self.dtypes = df.dtypes
+        # Full-frame scans several checks need; done here once rather than per check
+        self.nulls = df.isna().sum()
+        self.nunique = df.nunique(dropna=True)
+        # Non-null text values as str, converted once for every string-based check
+        self.text_values = {col: df[col].dropna().astype(str) for col in self.object_cols}
+        self._df = df
+        # Rows in the frame per row of num_mat (above 1 only for sampled profiles)
+        self.row_scale = 1.0
+    
+    def sampled(self, size: int, seed: int = 0) -> "ColumnProfile":
+        """
+        Copy of this profile whose numeric matrix holds a random subset of rows (in original order).
+        Column-level scans (nulls, nunique, dtypes, row hashes) still describe the full frame.
+        """
+        n_rows = self.num_mat.shape[0]
+        if size >= n_rows:
+            return self
+        
+        # Fixed seed so repeated analyses of the same file agree
+        idx = np.sort(np.random.default_rng(seed).choice(n_rows, size=size, replace=False))
+        sample = object.__new__(ColumnProfile)
+        sample.__dict__.update({
+            key: value for key, value in self.__dict__.items()
+            if key in ('numeric_cols', 'object_cols', 'dtypes', 'nulls', 'nunique', 'text_values', '_df', 'row_hashes')
+        })
+        sample.num_mat = np.ascontiguousarray(self.num_mat[idx])
+        sample.row_scale = n_rows / size
+        return sample
+    
+    @cached_property
+    def row_hashes(self) -> np.ndarray:
+        """64-bit hash of every row, reusable by any row-identity check"""
+        return row_hashes(self._df)
+    
+    @cached_property
+    def sorted_num_mat(self) -> np.ndarray:
+        """Numeric matrix sorted within each column (NaNs last), shared by quantile and unique counts"""
+        return np.sort(self.num_mat, axis=0)
+    
+    @cached_property
+    def num_nan_mask(self) -> np.ndarray:
+        """NaN mask of the numeric matrix, shared by the moment and count kernels"""
+        return np.isnan(self.num_mat)
+    
+    @cached_property
+    def num_counts(self) -> np.ndarray:
+        """Non-NaN values per numeric column"""
+        return self.num_mat.shape[0] - np.count_nonzero(self.num_nan_mask, axis=0)
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash each row to a uint64; rows that duplicated() treats as equal hash equal.
+    Float columns are normalized first so -0.0 and 0.0 get the same hash.
+    """
+    float_cols = df.select_dtypes(include=['floating']).columns
+    if len(float_cols) > 0:
+        df = df.copy(deep=False)
+        df[float_cols] = df[float_cols] + 0.0
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def duplicate_row_count(df: pd.DataFrame, hashes: np.ndarray) -> int:
+    """
+    Count rows duplicating an earlier row, like df.duplicated().sum().
+    Only rows whose hash repeats are compared exactly, so collisions cannot inflate the count.
+    """
+    candidates = pd.Index(hashes).duplicated(keep=False)
+    if not candidates.any():
+        return 0
+    return int(df[candidates].duplicated().sum())
+
+
+def nan_quantiles(
+    mat: np.ndarray, qs, sorted_mat: Optional[np.ndarray] = None, counts: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Per-column quantiles ignoring NaN, with numpy's default linear interpolation.
+    Sorts once for all columns instead of np.nanpercentile's per-column fallback on NaN input.
+    """
+    result = np.full((len(qs), mat.shape[1]), np.nan)
+    if mat.shape[0] == 0:
+        return result
+    
+    if sorted_mat is None:
+        sorted_mat = np.sort(mat, axis=0)  # NaNs sort last
+    count = counts if counts is not None else np.count_nonzero(~np.isnan(mat), axis=0)
+    cols = np.arange(mat.shape[1])
+    last = np.maximum(count - 1, 0)
+    
+    for i, q in enumerate(qs):
+        pos = q * (count - 1)
+        lo = np.clip(np.floor(pos).astype(np.int64), 0, last)
+        hi = np.minimum(lo + 1, last)
+        t = pos - lo
+        a, b = sorted_mat[lo, cols], sorted_mat[hi, cols]
+        # Same lerp as numpy so bounds match pandas' quantile exactly
+        diff = b - a
+        result[i] = np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+    
+    result[:, count == 0] = np.nan
+    return result
+
+
+def iqr_outlier_counts(
+    mat: np.ndarray, k: float, min_count: int = 4,
+    sorted_mat: Optional[np.ndarray] = None, counts: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Count values outside [Q1 - k*IQR, Q3 + k*IQR] for every column at once.
+    Columns with fewer than min_count values or a zero IQR get -1.
+    """
+    outliers = np.full(mat.shape[1], -1, dtype=np.int64)
+    if mat.size == 0:
+        return outliers
+    
+    if counts is None:
+        counts = np.count_nonzero(~np.isnan(mat), axis=0)
+    q1, q3 = nan_quantiles(mat, (0.25, 0.75), sorted_mat, counts)
+    iqr = q3 - q1
+    valid = (counts >= min_count) & (iqr != 0)
+    if not valid.any():
+        return outliers
+    
+    # Only compare the columns that can have outliers; NaN compares False
+    sub, q1, q3, iqr = mat[:, valid], q1[valid], q3[valid], iqr[valid]
+    outside = (sub < q1 - k * iqr) | (sub > q3 + k * iqr)
+    outliers[valid] = outside.sum(axis=0)
+    return outliers
+
+
+def column_range(
+    mat: np.ndarray, sorted_mat: Optional[np.ndarray] = None, counts: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Max minus min per column ignoring NaN (NaN for all-NaN columns)"""
+    if mat.shape[0] == 0:
+        return np.full(mat.shape[1], np.nan)
+    
+    if sorted_mat is not None and counts is not None:
+        # Extremes are the first and last non-NaN entries of each sorted column
+        cols = np.arange(mat.shape[1])
+        result = sorted_mat[np.maximum(counts - 1, 0), cols] - sorted_mat[0, cols]
+        result[counts == 0] = np.nan
+        return result
+    
+    with warnings.catch_warnings():
+        # All-NaN columns simply come out as NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmax(mat, axis=0) - np.nanmin(mat, axis=0)
+
+
+def column_skew(mat: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Bias-corrected sample skewness per column, matching pandas Series.skew()"""
+    if mask is None:
+        mask = np.isnan(mat)
+    count = (~mask).sum(axis=0).astype(np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(mask, 0.0, mat).sum(axis=0) / count
+        adjusted = np.where(mask, 0.0, mat - mean)
+        adjusted2 = adjusted ** 2
+        m2 = adjusted2.sum(axis=0)
+        m3 = (adjusted2 * adjusted).sum(axis=0)
+
+        # Treat floating point noise as exact zero, as pandas does
+        m2 = np.where(np.abs(m2) < 1e-14, 0.0, m2)
+        m3 = np.where(np.abs(m3) < 1e-14, 0.0, m3)
+
+        result = (count * (count - 1) ** 0.5 / (count - 2)) * (m3 / m2 ** 1.5)
+
+    result = np.where(m2 == 0, 0.0, result)
+    result[count < 3] = np.nan
+    return result
@@ -7,8 +7,49 @@ from app.models.schemas import (
     AnalysisResponse, DataIssue, IssueType, IssueSeverity, FileInfo
 )
 from app.services.file_handler import FileHandler
+from app.services.analysis_kernels import (
+    ColumnProfile, iqr_outlier_counts, column_range, column_skew, duplicate_row_count
+)
 from app.core.config import settings
+from anyio import to_thread
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Strings pd.to_numeric would parse as a finite or infinite number (ASCII digits only, as to_numeric)
+NUMERIC_RE = re.compile(
+    r'^\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*$|^\s*[+-]?inf(?:inity)?\s*$',
+    re.ASCII | re.IGNORECASE
+)
+
+# YYYY-MM-DD, MM/DD/YYYY or DD-MM-YYYY anywhere in the value
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4}')
+
+# Severity upper bounds (exclusive): below 5% is low, below 15% medium, below 30% high, else critical;
+# NaN sorts past every bin and ends up critical
+SEVERITY_BINS = np.array([0.05, 0.15, 0.30])
+SEVERITY_LEVELS = np.array(
+    [IssueSeverity.LOW, IssueSeverity.MEDIUM, IssueSeverity.HIGH, IssueSeverity.CRITICAL], dtype=object
+)
+
+# Anything that is not a letter, digit or whitespace
+SPECIAL_CHAR_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+# Shared pool for running the independent checks of one analysis side by side;
+# the heavy NumPy/pandas kernels release the GIL
+_check_executor = ThreadPoolExecutor(
+    max_workers=min(12, os.cpu_count() or 1), thread_name_prefix="analyzer"
+)
+
+# Recent analyses keyed by (file_id, data path, mtime, excluded columns); rewriting the
+# processed file changes its mtime, so stale entries are never hit and simply age out
+ANALYSIS_CACHE_SIZE = 32
+_analysis_cache: "OrderedDict[tuple, AnalysisResponse]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
 
 class DataAnalyzer:
     """Analyze datasets for data quality issues"""
@@ -17,23 +58,50 @@ class DataAnalyzer:
         self.file_handler = FileHandler()
     
     async def analyze_dataset(self, file_id: str, exclude_skewness_columns: set = None) -> AnalysisResponse:
-        """Perform comprehensive analysis on the dataset"""
+        """Perform comprehensive analysis on the dataset in a worker thread"""
+        return await to_thread.run_sync(self.analyze_dataset_sync, file_id, exclude_skewness_columns)
+    
+    def analyze_dataset_sync(self, file_id: str, exclude_skewness_columns: set = None) -> AnalysisResponse:
+        """Perform comprehensive analysis on the dataset (blocking), reusing a cached result if the file is unchanged"""
+        data_path = self.file_handler.get_current_file_path(file_id)
+        cache_key = (
+            file_id,
+            data_path,
+            os.stat(data_path).st_mtime_ns,
+            frozenset(exclude_skewness_columns or ())
+        )
+        with _analysis_cache_lock:
+            cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         df = self.file_handler.load_dataframe(file_id)
-        issues: List[DataIssue] = []
         
-        # Run all checks
-        issues.extend(self._check_missing_values(df))
-        issues.extend(self._check_duplicates(df))
-        issues.extend(self._check_outliers(df))
-        issues.extend(self._check_data_types(df))
-        issues.extend(self._check_categorical_issues(df))
-        issues.extend(self._check_constant_features(df))
-        issues.extend(self._check_correlated_features(df))
-        issues.extend(self._check_skewness(df, exclude_columns=exclude_skewness_columns))
-        issues.extend(self._check_high_cardinality(df))
-        issues.extend(self._check_date_formats(df))
-        issues.extend(self._check_text_issues(df))
-        issues.extend(self._check_imbalanced_data(df))
+        # Run all checks concurrently (they only read df and the shared profile);
+        # results are collected in submission order so the issue list stays stable
+        profile = ColumnProfile(df)
+        # On huge frames the statistical checks only need an estimate, so give them a row sample
+        stats_profile = profile
+        if len(df) > settings.ANALYSIS_SAMPLE_THRESHOLD:
+            stats_profile = profile.sampled(settings.ANALYSIS_SAMPLE_SIZE)
+        checks = [
+            (self._check_missing_values, (df, profile)),
+            (self._check_duplicates, (df, profile)),
+            (self._check_outliers, (df, stats_profile)),
+            (self._check_data_types, (df, profile)),
+            (self._check_categorical_issues, (df, profile)),
+            (self._check_constant_features, (df, profile)),
+            (self._check_correlated_features, (df, stats_profile)),
+            (self._check_skewness, (df, exclude_skewness_columns, stats_profile)),
+            (self._check_high_cardinality, (df, profile)),
+            (self._check_date_formats, (df, profile)),
+            (self._check_text_issues, (df, profile)),
+            (self._check_imbalanced_data, (df, profile)),
+        ]
+        futures = [_check_executor.submit(check, *args) for check, args in checks]
+        issues: List[DataIssue] = []
+        for future in futures:
+            issues.extend(future.result())
         
         # Create summary
         summary = self._create_summary(issues)
@@ -52,25 +120,34 @@ class DataAnalyzer:
             file_type=file_ext
         )
         
-        return AnalysisResponse(
+        result = AnalysisResponse(
             file_id=file_id,
             file_info=file_info,
             issues=issues,
             total_issues=len(issues),
             summary=summary
         )
+        
+        with _analysis_cache_lock:
+            _analysis_cache[cache_key] = result
+            if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                _analysis_cache.popitem(last=False)  # Drop the oldest entry
+        
+        return result
     
-    def _check_missing_values(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_missing_values(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for missing values"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        missing = df.isnull().sum()
+        missing = profile.nulls
         missing_cols = missing[missing > 0]
         
-        # Debug: Print to console
-        print(f"DEBUG: Total missing values: {missing.sum()}")
-        print(f"DEBUG: Missing per column: {missing_cols.to_dict()}")
-        print(f"DEBUG: DataFrame shape: {df.shape}")
-        print(f"DEBUG: DataFrame dtypes: {df.dtypes.to_dict()}")
+        # The dict conversions are only worth doing when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Total missing values: %s", missing.sum())
+            logger.debug("Missing per column: %s", missing_cols.to_dict())
+            logger.debug("DataFrame shape: %s", df.shape)
+            logger.debug("DataFrame dtypes: %s", profile.dtypes.to_dict())
         
         if len(missing_cols) > 0:
             total_cells = len(df) * len(df.columns)
@@ -89,10 +166,11 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_duplicates(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_duplicates(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for duplicate rows"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        duplicates = df.duplicated().sum()
+        duplicates = duplicate_row_count(df, profile.row_hashes)
         
         if duplicates > 0:
             issues.append(DataIssue(
@@ -108,31 +186,20 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_outliers(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_outliers(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for outliers in numerical columns"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        outlier_cols = {}
+        numeric_cols, mat = profile.numeric_cols, profile.num_mat
         
-        for col in numeric_cols:
-            # Skip if column has too few non-null values
-            if df[col].notna().sum() < 4:
-                continue
-                
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            # Skip if IQR is 0 (all values are same)
-            if IQR == 0:
-                continue
-                
-            lower_bound = Q1 - settings.OUTLIER_THRESHOLD * IQR
-            upper_bound = Q3 + settings.OUTLIER_THRESHOLD * IQR
-            
-            outliers = ((df[col] < lower_bound) | (df[col] > upper_bound)).sum()
-            if outliers > 0:
-                outlier_cols[col] = int(outliers)
+        # Quartiles, bounds and counts for all numeric columns in one pass (-1 = skipped column)
+        counts = iqr_outlier_counts(
+            mat, settings.OUTLIER_THRESHOLD, sorted_mat=profile.sorted_num_mat, counts=profile.num_counts
+        )
+        # Sampled profiles scale counts back up to the full frame
+        outlier_cols = {
+            col: int(round(count * profile.row_scale)) for col, count in zip(numeric_cols, counts) if count > 0
+        }
         
         if outlier_cols:
             total_outliers = sum(outlier_cols.values())
@@ -148,20 +215,21 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_data_types(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_data_types(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for inconsistent data types"""
+        profile = profile or ColumnProfile(df)
         issues = []
         inconsistent_cols = []
         
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                # Check if column contains mixed types
-                try:
-                    numeric_count = pd.to_numeric(df[col], errors='coerce').notna().sum()
-                    if 0 < numeric_count < len(df[col].dropna()):
-                        inconsistent_cols.append(col)
-                except:
-                    pass
+        for col in profile.object_cols:
+            # Check if column contains mixed types; a regex scan avoids building a float array
+            try:
+                values = profile.text_values[col]
+                numeric_count = values.str.match(NUMERIC_RE).sum()
+                if 0 < numeric_count < len(values):
+                    inconsistent_cols.append(col)
+            except:
+                pass
         
         if inconsistent_cols:
             issues.append(DataIssue(
@@ -176,19 +244,21 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_categorical_issues(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_categorical_issues(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for categorical data issues"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        categorical_cols = profile.object_cols
         problematic_cols = {}
         
         for col in categorical_cols:
+            if profile.nunique[col] < 2:
+                continue
             unique_values = df[col].dropna().unique()
-            # Check for inconsistent naming (e.g., 'yes', 'Yes', 'YES')
-            if len(unique_values) > 1:
-                lower_values = [str(v).lower().strip() for v in unique_values]
-                if len(set(lower_values)) < len(unique_values):
-                    problematic_cols[col] = list(unique_values[:5])  # Sample
+            # Check for inconsistent naming (e.g., 'yes', 'Yes', 'YES') with vectorized string ops
+            normalized = pd.Index(unique_values).astype(str).str.lower().str.strip()
+            if normalized.has_duplicates:
+                problematic_cols[col] = list(unique_values[:5])  # Sample
         
         if problematic_cols:
             issues.append(DataIssue(
@@ -203,14 +273,11 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_constant_features(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_constant_features(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for constant or near-constant features"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        constant_cols = []
-        
-        for col in df.columns:
-            if df[col].nunique() == 1:
-                constant_cols.append(col)
+        constant_cols = profile.nunique.index[profile.nunique.to_numpy() == 1].tolist()
         
         if constant_cols:
             issues.append(DataIssue(
@@ -225,29 +292,36 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_correlated_features(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_correlated_features(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for highly correlated features"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        
-        if len(numeric_cols) > 1:
-            corr_matrix = df[numeric_cols].corr().abs()
-            upper_triangle = corr_matrix.where(
-                np.triu(np.ones(corr_matrix.shape), k=1).astype(bool)
-            )
+        numeric_cols, mat = profile.numeric_cols, profile.num_mat
+        
+        if len(numeric_cols) > 1 and mat.shape[0] > 1:
+            if np.isnan(mat).any():
+                # Pairwise-complete correlations need pandas' NaN handling
+                corr_matrix = pd.DataFrame(mat).corr().to_numpy()
+            else:
+                # Constant columns give NaN, which never passes the threshold
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    corr_matrix = np.corrcoef(mat, rowvar=False)
+            corr_matrix = np.abs(corr_matrix)
             
-            high_corr = []
-            for col in upper_triangle.columns:
-                corr_cols = upper_triangle[col][upper_triangle[col] > settings.CORRELATION_THRESHOLD]
-                if len(corr_cols) > 0:
-                    for corr_col in corr_cols.index:
-                        high_corr.append((col, corr_col, round(corr_cols[corr_col], 2)))
+            # Upper-triangle hits as (column, earlier column) pairs, ordered by column
+            upper_hits = np.triu(corr_matrix > settings.CORRELATION_THRESHOLD, k=1)
+            pairs = np.argwhere(upper_hits.T)
+            high_corr = [
+                (numeric_cols[j], numeric_cols[i], round(float(corr_matrix[i, j]), 2))
+                for j, i in pairs
+            ]
             
             if high_corr:
                 issues.append(DataIssue(
                     type=IssueType.CORRELATED_FEATURES,
                     severity=IssueSeverity.LOW,
-                    affected_columns=list(set([c[0] for c in high_corr] + [c[1] for c in high_corr])),
+                    # Every column in any pair, once, in frame order
+                    affected_columns=numeric_cols[np.unique(pairs)].tolist(),
                     description=f"Found {len(high_corr)} pairs of highly correlated features",
                     count=len(high_corr),
                     details={"correlations": [{"col1": c[0], "col2": c[1], "correlation": c[2]} for c in high_corr]},
@@ -256,33 +330,39 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_skewness(self, df: pd.DataFrame, exclude_columns: set = None) -> List[DataIssue]:
+    def _check_skewness(
+        self, df: pd.DataFrame, exclude_columns: set = None, profile: ColumnProfile = None
+    ) -> List[DataIssue]:
         """Check for skewed distributions"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_cols, mat = profile.numeric_cols, profile.num_mat
         skewed_cols = {}
+        if len(numeric_cols) == 0:
+            return issues
         
-        for col in numeric_cols:
+        # Unique counts, ranges and skewness for all numeric columns at once, reusing the
+        # profile's nunique scan, sorted matrix and NaN mask instead of new passes over mat
+        unique_counts = profile.nunique[numeric_cols].to_numpy()
+        value_range = column_range(mat, profile.sorted_num_mat, profile.num_counts)
+        skewness = column_skew(mat, profile.num_nan_mask)
+        
+        # Add tolerance to prevent re-detection of marginally skewed columns after transformation
+        # If threshold is 1.0, only flag if skewness > 1.1 (10% tolerance)
+        detection_threshold = settings.SKEWNESS_THRESHOLD * 1.1
+        
+        for i, col in enumerate(numeric_cols):
             # Skip excluded columns (previously failed transformations)
             if exclude_columns and col in exclude_columns:
                 continue
-                
+            
             # Skip columns with too few unique values (can't be meaningfully transformed)
-            unique_count = df[col].nunique()
-            if unique_count < 5:
-                continue
-                
-            # Skip columns with insufficient variation
-            col_min, col_max = df[col].min(), df[col].max()
-            if col_max - col_min < 0.01:
+            # or insufficient variation
+            if unique_counts[i] < 5 or value_range[i] < 0.01:
                 continue
             
-            skewness = df[col].skew()
-            # Add tolerance to prevent re-detection of marginally skewed columns after transformation
-            # If threshold is 1.0, only flag if skewness > 1.1 (10% tolerance)
-            detection_threshold = settings.SKEWNESS_THRESHOLD * 1.1
-            if abs(skewness) > detection_threshold:
-                skewed_cols[col] = round(skewness, 2)
+            if abs(skewness[i]) > detection_threshold:
+                skewed_cols[col] = round(float(skewness[i]), 2)
         
         if skewed_cols:
             issues.append(DataIssue(
@@ -297,16 +377,14 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_high_cardinality(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_high_cardinality(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for high cardinality categorical features"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        high_card_cols = {}
-        
-        for col in categorical_cols:
-            unique_count = df[col].nunique()
-            if unique_count > settings.HIGH_CARDINALITY_THRESHOLD:
-                high_card_cols[col] = unique_count
+        categorical_cols = profile.object_cols
+        unique_counts = profile.nunique[categorical_cols]
+        high_card = unique_counts[unique_counts.to_numpy() > settings.HIGH_CARDINALITY_THRESHOLD]
+        high_card_cols = {col: int(count) for col, count in high_card.items()}
         
         if high_card_cols:
             issues.append(DataIssue(
@@ -321,27 +399,18 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_date_formats(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_date_formats(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for wrong or inconsistent date formats"""
+        profile = profile or ColumnProfile(df)
         issues = []
         date_cols = []
         
-        for col in df.select_dtypes(include=['object']).columns:
-            sample = df[col].dropna().head(100)
+        for col in profile.object_cols:
+            sample = profile.text_values[col].head(100)
             # Check if column might contain dates
-            date_patterns = [
-                r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-                r'\d{2}/\d{2}/\d{4}',  # MM/DD/YYYY
-                r'\d{2}-\d{2}-\d{4}',  # DD-MM-YYYY
-            ]
-            
-            matches = sum(sample.astype(str).str.contains('|'.join(date_patterns), regex=True))
+            matches = sample.str.contains(DATE_RE).sum()
             if matches > len(sample) * 0.5:  # If more than 50% match date patterns
-                try:
-                    pd.to_datetime(sample, errors='coerce')
-                    date_cols.append(col)
-                except:
-                    pass
+                date_cols.append(col)
         
         if date_cols:
             issues.append(DataIssue(
@@ -356,16 +425,18 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_text_issues(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_text_issues(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for noisy text data"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        text_cols = df.select_dtypes(include=['object']).columns
+        text_cols = profile.object_cols
         noisy_cols = []
         
         for col in text_cols:
-            sample = df[col].dropna().head(100).astype(str)
+            # Ratio of the per-value means equals the ratio of totals, so scan the joined sample once
+            text = ''.join(profile.text_values[col].head(100))
             # Check for excessive punctuation or special characters
-            special_char_ratio = sample.str.count(r'[^a-zA-Z0-9\s]').mean() / sample.str.len().mean()
+            special_char_ratio = len(SPECIAL_CHAR_RE.findall(text)) / max(len(text), 1)
             if special_char_ratio > 0.2:  # If more than 20% special chars
                 noisy_cols.append(col)
         
@@ -382,58 +453,50 @@ class DataAnalyzer:
         
         return issues
     
-    def _check_imbalanced_data(self, df: pd.DataFrame) -> List[DataIssue]:
+    def _check_imbalanced_data(self, df: pd.DataFrame, profile: ColumnProfile = None) -> List[DataIssue]:
         """Check for imbalanced target columns"""
+        profile = profile or ColumnProfile(df)
         issues = []
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        categorical_cols = profile.object_cols
         
-        for col in categorical_cols:
-            value_counts = df[col].value_counts()
-            if len(value_counts) > 1 and len(value_counts) < 10:  # Likely a target variable
-                ratio = value_counts.max() / value_counts.min()
-                if ratio > 3:  # Imbalance threshold
-                    issues.append(DataIssue(
-                        type=IssueType.IMBALANCED_DATA,
-                        severity=IssueSeverity.MEDIUM,
-                        affected_columns=[col],
-                        description=f"Column '{col}' has imbalanced class distribution",
-                        count=1,
-                        details={
-                            "distribution": value_counts.to_dict(),
-                            "imbalance_ratio": round(ratio, 2)
-                        },
-                        recommended_actions=["Apply SMOTE", "Undersample majority class", "Oversample minority class"]
-                    ))
+        # Only low-cardinality columns are likely targets; skip the rest before counting values
+        unique_counts = profile.nunique[categorical_cols]
+        target_cols = unique_counts.index[(unique_counts > 1) & (unique_counts < 10)]
+        
+        for col in target_cols:
+            value_counts = df[col].value_counts()  # Sorted by count, largest first
+            ratio = value_counts.iat[0] / value_counts.iat[-1]
+            if ratio > 3:  # Imbalance threshold
+                issues.append(DataIssue(
+                    type=IssueType.IMBALANCED_DATA,
+                    severity=IssueSeverity.MEDIUM,
+                    affected_columns=[col],
+                    description=f"Column '{col}' has imbalanced class distribution",
+                    count=1,
+                    details={
+                        "distribution": value_counts.to_dict(),
+                        "imbalance_ratio": round(ratio, 2)
+                    },
+                    recommended_actions=["Apply SMOTE", "Undersample majority class", "Oversample minority class"]
+                ))
         
         return issues
     
     def _get_severity(self, percentage: float) -> IssueSeverity:
-        """Determine severity based on percentage"""
-        if percentage < 0.05:
-            return IssueSeverity.LOW
-        elif percentage < 0.15:
-            return IssueSeverity.MEDIUM
-        elif percentage < 0.30:
-            return IssueSeverity.HIGH
-        else:
-            return IssueSeverity.CRITICAL
+        """Determine severity based on percentage (also accepts an array of percentages)"""
+        return SEVERITY_LEVELS[np.searchsorted(SEVERITY_BINS, percentage, side='right')]
     
     def _create_summary(self, issues: List[DataIssue]) -> Dict[str, int]:
         """Create summary of issues by severity"""
-        summary = {
-            "critical": 0,
-            "high": 0,
-            "medium": 0,
-            "low": 0
-        }
-        
-        for issue in issues:
-            summary[issue.severity.value] += 1
-        
-        return summary
+        counts = Counter(issue.severity.value for issue in issues)
+        return {severity: counts[severity] for severity in ("critical", "high", "medium", "low")}
     
     async def get_data_preview(self, file_id: str, rows: int = 10) -> Dict[str, Any]:
-        """Get a preview of the dataset"""
+        """Get a preview of the dataset in a worker thread"""
+        return await to_thread.run_sync(self.get_data_preview_sync, file_id, rows)
+    
+    def get_data_preview_sync(self, file_id: str, rows: int = 10) -> Dict[str, Any]:
+        """Get a preview of the dataset (blocking)"""
         df = self.file_handler.load_dataframe(file_id)
         
         return {
@@ -1,66 +1,163 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from typing import Dict, List, Any, Optional, Tuple
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression, LogisticRegression
 from sklearn.metrics import accuracy_score, confusion_matrix, r2_score, silhouette_score
-from scipy.stats import pearsonr, spearmanr
+from scipy.stats import rankdata, t as student_t
 from mlxtend.frequent_patterns import apriori, association_rules
-from mlxtend.preprocessing import TransactionEncoder
+from cachetools import LRUCache
+from app.core.config import settings
 import json
+import os
+import threading
+from functools import lru_cache
+
+
+# Above this many rows clustering switches to mini-batch K-Means on float32 data
+MINIBATCH_KMEANS_THRESHOLD = 10_000
+# Silhouette is O(n^2); larger datasets are scored on a random sample of this size
+SILHOUETTE_SAMPLE_SIZE = 10_000
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    """In-memory size of a frame, object columns included"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+# Whole parsed files keyed by (path, mtime_ns), bounded by their total in-memory size;
+# column selections are projected from the cached frame, so every selection shares one entry
+_frame_cache = LRUCache(maxsize=settings.MINING_FRAME_CACHE_BYTES, getsizeof=_frame_bytes)
+_frame_cache_lock = threading.Lock()
+
+
+def _read_frame(file_path: str, mtime_ns: int) -> pd.DataFrame:
+    """
+    Parse a dataset file; mtime_ns busts the cache when the file is rewritten.
+    The frame is shared between callers, so analyses must never modify it in place.
+    """
+    key = (file_path, mtime_ns)
+    with _frame_cache_lock:
+        df = _frame_cache.get(key)
+    if df is not None:
+        return df
+    
+    if file_path.endswith('.csv'):
+        df = pd.read_csv(file_path)
+    elif file_path.endswith(('.xlsx', '.xls')):
+        df = pd.read_excel(file_path)
+    else:
+        raise ValueError("Unsupported file format")
+    df = _downcast_integers(df)
+    
+    with _frame_cache_lock:
+        # Older versions of a rewritten file can never be hit again, so free them now
+        for stale in [k for k in _frame_cache if k[0] == file_path and k != key]:
+            del _frame_cache[stale]
+        try:
+            _frame_cache[key] = df
+        except ValueError:
+            pass  # Larger than the whole budget: served without caching
+    return df
+
+
+def _project(df: pd.DataFrame, usecols: Optional[Tuple[str, ...]]) -> pd.DataFrame:
+    """The requested columns of a cached frame (all of them when none are given)"""
+    if not usecols:
+        return df
+    missing = [col for col in usecols if col not in df.columns]
+    if missing:
+        raise ValueError(f"Columns not found in dataset: {missing}")
+    return df[list(usecols)]
+
+
+def _downcast_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrow integer columns to the smallest dtype that holds their values, shrinking cached frames.
+    Lossless, unlike a float32 downcast, which would change every statistic computed from the column.
+    The parsed dtypes are kept in df.attrs["source_dtypes"], so the API keeps reporting those.
+    """
+    df.attrs["source_dtypes"] = {col: str(dtype) for col, dtype in df.dtypes.items()}
+    for col in df.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+@lru_cache(maxsize=64)
+def _describe_columns(file_path: str, mtime_ns: int, usecols: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Column metadata for a cached frame, computed once per file version"""
+    full = _read_frame(file_path, mtime_ns)
+    df = _project(full, usecols)
+    source_dtypes = full.attrs["source_dtypes"]
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    
+    return {
+        "all_columns": df.columns.tolist(),
+        "numeric_columns": numeric_cols,
+        "categorical_columns": categorical_cols,
+        "total_rows": len(df),
+        "column_types": {col: source_dtypes[col] for col in df.columns}
+    }
+
+
+@lru_cache(maxsize=8)
+def _null_counts(file_path: str, mtime_ns: int) -> pd.Series:
+    """Missing values per column of a cached frame, computed once per file version"""
+    return _read_frame(file_path, mtime_ns).isna().sum()
 
 
 class DataMiningService:
     """Service for performing data mining and analytics operations"""
 
-    def __init__(self, file_path: str):
-        """Initialize with file path"""
+    def __init__(self, file_path: str, columns: Optional[List[str]] = None):
+        """Initialize with file path, optionally reading only the given columns"""
         self.file_path = file_path
         self.df = None
-        self._load_data()
+        self._load_data(columns)
 
-    def _load_data(self):
+    def _load_data(self, columns: Optional[List[str]] = None):
         """Load data from file"""
-        if self.file_path.endswith('.csv'):
-            self.df = pd.read_csv(self.file_path)
-        elif self.file_path.endswith(('.xlsx', '.xls')):
-            self.df = pd.read_excel(self.file_path)
-        else:
-            raise ValueError("Unsupported file format")
+        # Repeated requests on an unchanged file reuse the parsed frame, whatever columns they pick
+        self._usecols = tuple(dict.fromkeys(columns)) if columns else None
+        self._file_key = (self.file_path, os.stat(self.file_path).st_mtime_ns)
+        self.df = _project(_read_frame(*self._file_key), self._usecols)
+
+    def _complete_rows(self, columns: List[str]) -> pd.DataFrame:
+        """Rows with no missing value in the given columns; skips the null scan when the columns have none"""
+        if _null_counts(*self._file_key)[columns].sum() == 0:
+            return self.df[columns]
+        return self.df[columns].dropna()
 
     def get_columns_info(self) -> Dict[str, Any]:
-        """Get information about columns in the dataset"""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_cols = self.df.select_dtypes(include=['object', 'category']).columns.tolist()
-        
-        return {
-            "all_columns": self.df.columns.tolist(),
-            "numeric_columns": numeric_cols,
-            "categorical_columns": categorical_cols,
-            "total_rows": len(self.df),
-            "column_types": {col: str(dtype) for col, dtype in self.df.dtypes.items()}
-        }
+        """Get information about columns in the dataset (shared result; do not modify)"""
+        return _describe_columns(*self._file_key, self._usecols)
 
     def correlation_analysis(self, col1: str, col2: str) -> Dict[str, Any]:
         """Perform correlation analysis between two numeric columns"""
         # Remove missing values
-        data = self.df[[col1, col2]].dropna()
+        data = self._complete_rows([col1, col2])
         
         if len(data) < 2:
             raise ValueError("Not enough data points for correlation analysis")
         
+        # One float64 copy of both columns, shared by every statistic below
+        arr = data.to_numpy(dtype=np.float64)
+        
         # Calculate Pearson correlation
-        pearson_corr, pearson_p = pearsonr(data[col1], data[col2])
+        pearson_corr, pearson_p = self._pearson(arr[:, 0], arr[:, 1])
         
-        # Calculate Spearman correlation
-        spearman_corr, spearman_p = spearmanr(data[col1], data[col2])
+        # Calculate Spearman correlation: Pearson on average ranks (ties share the mean of their
+        # positions, as spearmanr does), both columns ranked by one sort-based pass in C
+        ranks = rankdata(arr, method='average', axis=0)
+        spearman_corr, spearman_p = self._pearson(ranks[:, 0], ranks[:, 1])
         
         # Prepare scatter plot data
         scatter_data = [
-            {"x": float(x), "y": float(y)} 
-            for x, y in zip(data[col1].values[:1000], data[col2].values[:1000])  # Limit to 1000 points
+            {"x": x, "y": y}
+            for x, y in arr[:1000].tolist()  # Limit to 1000 points
         ]
         
         # Interpretation
@@ -84,10 +181,22 @@ class DataMiningService:
             "sample_size": len(data)
         }
 
+    @staticmethod
+    def _pearson(x: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
+        """Pearson r with its two-sided p-value from the t distribution (same values as scipy's pearsonr)"""
+        n = len(x)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = np.corrcoef(x, y)[0, 1]
+            r = np.clip(r, -1.0, 1.0)
+            if n <= 2:
+                return float(r), 1.0
+            t = r * np.sqrt((n - 2) / (1.0 - r * r))
+        return float(r), float(2 * student_t.sf(abs(t), n - 2))
+
     def clustering_analysis(self, columns: List[str], n_clusters: int = 3) -> Dict[str, Any]:
         """Perform K-Means clustering"""
         # Prepare data
-        data = self.df[columns].dropna()
+        data = self._complete_rows(columns)
         
         if len(data) < n_clusters:
             raise ValueError(f"Not enough data points for {n_clusters} clusters")
@@ -96,22 +205,24 @@ class DataMiningService:
         scaler = StandardScaler()
         scaled_data = scaler.fit_transform(data)
         
-        # Perform clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        # Perform clustering; large datasets use mini-batches on float32 to cut the number of full passes
+        if len(data) < MINIBATCH_KMEANS_THRESHOLD:
+            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        else:
+            scaled_data = scaled_data.astype(np.float32)
+            kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3, batch_size=4096)
         clusters = kmeans.fit_predict(scaled_data)
         
         # Calculate silhouette score
-        silhouette = silhouette_score(scaled_data, clusters)
+        sample_size = SILHOUETTE_SAMPLE_SIZE if len(data) > SILHOUETTE_SAMPLE_SIZE else None
+        silhouette = silhouette_score(scaled_data, clusters, sample_size=sample_size, random_state=42)
         
         # Prepare visualization data (for 2D plot, use first 2 columns)
         if len(columns) >= 2:
+            points = data.iloc[:1000, :2].to_numpy(dtype=np.float64).tolist()
             scatter_data = [
-                {
-                    "x": float(data.iloc[i, 0]),
-                    "y": float(data.iloc[i, 1]),
-                    "cluster": int(clusters[i])
-                }
-                for i in range(min(len(data), 1000))
+                {"x": x, "y": y, "cluster": cluster}
+                for (x, y), cluster in zip(points, clusters[:1000].tolist())
             ]
         else:
             scatter_data = []
@@ -121,28 +232,28 @@ class DataMiningService:
         
         return {
             "n_clusters": n_clusters,
-            "cluster_labels": clusters.tolist()[:1000],  # Limit output
+            "cluster_labels": clusters[:1000].tolist(),  # Limit output
             "cluster_centers": centers.tolist(),
             "silhouette_score": float(silhouette),
             "scatter_data": scatter_data,
-            "cluster_sizes": {int(i): int(np.sum(clusters == i)) for i in range(n_clusters)},
+            "cluster_sizes": dict(enumerate(np.bincount(clusters, minlength=n_clusters).tolist())),
             "interpretation": f"Silhouette score: {silhouette:.2f} ({'good' if silhouette > 0.5 else 'fair' if silhouette > 0.25 else 'poor'} clustering)"
         }
 
     def classification_analysis(self, target_col: str, feature_cols: List[str], test_size: float = 0.2) -> Dict[str, Any]:
         """Perform classification analysis"""
         # Prepare data
-        data = self.df[[target_col] + feature_cols].dropna()
+        data = self._complete_rows([target_col] + feature_cols)
         
         if len(data) < 10:
             raise ValueError("Not enough data for classification")
         
-        X = data[feature_cols]
-        y = data[target_col]
+        # Plain arrays from here on; sklearn would otherwise validate and copy the frames itself
+        X = data[feature_cols].to_numpy(dtype=np.float64)
+        y = data[target_col].to_numpy()
         
         # Encode target if categorical
-        le = LabelEncoder()
-        y_encoded = le.fit_transform(y)
+        y_encoded, class_labels = pd.factorize(y, sort=True)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -163,7 +274,7 @@ class DataMiningService:
         return {
             "accuracy": float(accuracy),
             "confusion_matrix": conf_matrix.tolist(),
-            "class_labels": le.classes_.tolist(),
+            "class_labels": class_labels.tolist(),
             "feature_importance": {
                 feature_cols[i]: float(abs(model.coef_[0][i])) 
                 for i in range(len(feature_cols))
@@ -175,13 +286,14 @@ class DataMiningService:
     def regression_analysis(self, target_col: str, feature_cols: List[str], test_size: float = 0.2) -> Dict[str, Any]:
         """Perform linear regression analysis"""
         # Prepare data
-        data = self.df[[target_col] + feature_cols].dropna()
+        data = self._complete_rows([target_col] + feature_cols)
         
         if len(data) < 10:
             raise ValueError("Not enough data for regression")
         
-        X = data[feature_cols]
-        y = data[target_col]
+        # Plain arrays from here on; sklearn would otherwise validate and copy the frames itself
+        X = data[feature_cols].to_numpy(dtype=np.float64)
+        y = data[target_col].to_numpy(dtype=np.float64)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -199,9 +311,10 @@ class DataMiningService:
         r2 = r2_score(y_test, y_pred)
         
         # Prepare scatter data (actual vs predicted)
+        actual = y_test[:500].tolist()
         scatter_data = [
-            {"actual": float(y_test.iloc[i]), "predicted": float(y_pred[i])}
-            for i in range(min(len(y_test), 500))
+            {"actual": a, "predicted": p}
+            for a, p in zip(actual, y_pred[:500].astype(np.float64).tolist())
         ]
         
         return {
@@ -221,7 +334,9 @@ class DataMiningService:
         results = {}
         
         for col in columns:
-            col_data = self.df[col].dropna()
+            col_data = self.df[col]
+            if _null_counts(*self._file_key)[col]:
+                col_data = col_data.dropna()
             
             if pd.api.types.is_numeric_dtype(col_data):
                 # Numeric statistics
@@ -256,34 +371,32 @@ class DataMiningService:
     def _get_histogram(self, data: pd.Series, bins: int = 20) -> List[Dict[str, float]]:
         """Generate histogram data"""
         counts, bin_edges = np.histogram(data, bins=bins)
-        histogram = [
-            {
-                "bin_start": float(bin_edges[i]),
-                "bin_end": float(bin_edges[i + 1]),
-                "count": int(counts[i])
-            }
-            for i in range(len(counts))
+        edges = bin_edges.astype(np.float64).tolist()
+        return [
+            {"bin_start": start, "bin_end": end, "count": count}
+            for start, end, count in zip(edges[:-1], edges[1:], counts.tolist())
         ]
-        return histogram
 
     def association_rules_analysis(self, columns: List[str], min_support: float = 0.01) -> Dict[str, Any]:
         """Perform association rules mining (for categorical data)"""
         # Prepare transaction data
-        data = self.df[columns].dropna()
-        
-        # Convert to transaction format
-        transactions = []
-        for _, row in data.iterrows():
-            transaction = [f"{col}={val}" for col, val in row.items()]
-            transactions.append(transaction)
+        data = self._complete_rows(columns)
         
-        if len(transactions) < 10:
+        if len(data) < 10:
             raise ValueError("Not enough transactions for association rules")
         
-        # Encode transactions
-        te = TransactionEncoder()
-        te_ary = te.fit(transactions).transform(transactions)
-        df_encoded = pd.DataFrame(te_ary, columns=te.columns_)
+        # One "col=value" item per cell; the row-wise common dtype matches what iterrows would yield
+        values = data.to_numpy()
+        labels = np.column_stack([
+            (f"{col}=" + pd.Series(values[:, j]).astype(str)).to_numpy(dtype=object)
+            for j, col in enumerate(data.columns)
+        ])
+        
+        # One-hot encode directly: sorted item columns, exactly like TransactionEncoder
+        items, codes = np.unique(labels, return_inverse=True)
+        te_ary = np.zeros((len(data), len(items)), dtype=bool)
+        te_ary[np.arange(len(data))[:, None], codes.reshape(labels.shape)] = True
+        df_encoded = pd.DataFrame(te_ary, columns=items.tolist())
         
         # Find frequent itemsets
         frequent_itemsets = apriori(df_encoded, min_support=min_support, use_colnames=True)
@@ -298,29 +411,37 @@ class DataMiningService:
         # Generate rules
         rules = association_rules(frequent_itemsets, metric="confidence", min_threshold=0.5)
         
-        # Format results
+        # Format results straight from the columns; iterrows would box every row into a Series
+        top_itemsets = frequent_itemsets.head(20)
         itemsets_list = [
             {
-                "itemset": list(row['itemsets']),
-                "support": float(row['support'])
+                "itemset": list(itemset),
+                "support": support
             }
-            for _, row in frequent_itemsets.head(20).iterrows()
+            for itemset, support in zip(top_itemsets['itemsets'].tolist(), top_itemsets['support'].astype(np.float64).tolist())
         ]
         
+        top_rules = rules.head(20)
         rules_list = [
             {
-                "antecedent": list(row['antecedents']),
-                "consequent": list(row['consequents']),
-                "support": float(row['support']),
-                "confidence": float(row['confidence']),
-                "lift": float(row['lift'])
+                "antecedent": list(antecedent),
+                "consequent": list(consequent),
+                "support": support,
+                "confidence": confidence,
+                "lift": lift
             }
-            for _, row in rules.head(20).iterrows()
-        ] if len(rules) > 0 else []
+            for antecedent, consequent, support, confidence, lift in zip(
+                top_rules['antecedents'].tolist(),
+                top_rules['consequents'].tolist(),
+                top_rules['support'].astype(np.float64).tolist(),
+                top_rules['confidence'].astype(np.float64).tolist(),
+                top_rules['lift'].astype(np.float64).tolist()
+            )
+        ]
         
         return {
             "frequent_itemsets": itemsets_list,
             "rules": rules_list,
-            "total_transactions": len(transactions),
+            "total_transactions": len(data),
             "interpretation": f"Found {len(frequent_itemsets)} frequent itemsets and {len(rules)} association rules"
         }
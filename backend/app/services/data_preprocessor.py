@@ -1,14 +1,119 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder, StandardScaler, MinMaxScaler, RobustScaler
-from typing import List, Dict, Any
-from app.models.schemas import PreprocessAction, PreprocessResponse, IssueType, DataIssue, IssueSeverity
+from anyio import to_thread
+from scipy import stats
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from app.models.schemas import (
+    PreprocessAction, PreprocessResponse, IssueType, DataIssue, IssueSeverity,
+    AnalysisResponse, FileInfo
+)
+from app.models.database import File as DBFile
+from app.database import get_db
+from app.core.config import settings
 from app.services.file_handler import FileHandler
 from app.services.data_analyzer import DataAnalyzer
+from app.services.analysis_kernels import ColumnProfile, nan_quantiles
+from concurrent.futures import ThreadPoolExecutor
 import re
 import json
 import os
 
+# One-hot encoding columns with more categories than this logs a width warning
+ONE_HOT_WARN_CARDINALITY = 100
+
+# Actions whose handler only rewrites the action's own columns in place (no rows or
+# columns added or dropped), by issue type: the normalized methods that qualify, or
+# an empty set when every method does
+COLUMN_LOCAL_METHODS = {
+    IssueType.MISSING_VALUES: {"mean", "median", "mode", "forward_fill", "backward_fill"},
+    IssueType.OUTLIERS: {"cap", "log"},
+    IssueType.CATEGORICAL_INCONSISTENCIES: {"normalize", "label_encode"},
+    IssueType.WRONG_DATE_FORMAT: {"standardize"},
+    IssueType.NOISY_TEXT: set(),
+    IssueType.SKEWNESS: set(),
+    IssueType.HIGH_CARDINALITY: {"group_rare"},
+    IssueType.INCONSISTENT_TYPES: set(),
+}
+
+# Actions that only drop columns (whatever the method), so adjacent ones can share one drop
+COLUMN_REMOVAL_TYPES = {IssueType.CONSTANT_VALUES, IssueType.CORRELATED_FEATURES}
+
+# Column-local actions whose handler treats every column on its own, so one wide action
+# can be split into column groups that run side by side
+COLUMN_SPLIT_TYPES = {
+    IssueType.CATEGORICAL_INCONSISTENCIES,
+    IssueType.NOISY_TEXT,
+    IssueType.SKEWNESS,
+    IssueType.HIGH_CARDINALITY,
+    IssueType.INCONSISTENT_TYPES,
+}
+
+# Shared pool for applying independent column-local actions side by side
+ACTION_WORKERS = min(8, os.cpu_count() or 1)
+_action_executor = ThreadPoolExecutor(max_workers=ACTION_WORKERS, thread_name_prefix="preprocessor")
+
+# Largest magnitude float32 holds every integer up to; SMOTE only runs in float32 below it
+FLOAT32_EXACT_LIMIT = 2 ** 24
+
+# Scaler class per apply_scaling method
+SCALERS = {
+    "minmax": MinMaxScaler,
+    "standard": StandardScaler,
+    "robust": RobustScaler,
+}
+
+# Text cleaning, built once
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+# Simple stopword removal (can be enhanced with NLTK)
+STOPWORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'})
+# Leading values sampled to decide whether a text column repeats enough to clean distinct values only
+STOPWORD_DEDUP_PROBE = 1000
+
+def _remove_stopwords(series: pd.Series) -> List[str]:
+    """Stopword-free str() of every value in a column; plain split/join beats both apply and a regex pass"""
+    values = series.tolist()
+    
+    # Clean each distinct value once when values repeat, as text columns usually do (probed on
+    # the first rows). Only all-string columns qualify: equal keys like 1, 1.0 and True print differently
+    head = values[:STOPWORD_DEDUP_PROBE]
+    if pd.api.types.is_string_dtype(series) and len(set(head)) <= len(head) // 2:
+        codes, uniques = pd.factorize(series)
+        if len(uniques) <= len(values) // 2:
+            cleaned = np.empty(len(uniques) + 1, dtype=object)
+            cleaned[:-1] = [' '.join([word for word in x.split() if word.lower() not in STOPWORDS]) for x in uniques.tolist()]
+            result = cleaned[codes]
+            
+            # Missing values keep their own str() ('nan', 'None', ...)
+            for i in np.flatnonzero(codes == -1).tolist():
+                result[i] = ' '.join([word for word in str(values[i]).split() if word.lower() not in STOPWORDS])
+            return result.tolist()
+    
+    return [' '.join([word for word in str(x).split() if word.lower() not in STOPWORDS]) for x in values]
+
+
+def _fits_float32(X: pd.DataFrame) -> bool:
+    """Whether every non-boolean column stays within FLOAT32_EXACT_LIMIT, so float32 keeps its integers exact"""
+    for col in X.columns:
+        if pd.api.types.is_bool_dtype(X[col]):
+            continue
+        if max(abs(X[col].min()), abs(X[col].max())) > FLOAT32_EXACT_LIMIT:
+            return False
+    return True
+
+
+def _log1p_shifted(series: pd.Series, min_val) -> np.ndarray:
+    """
+    log1p of a numeric column, first shifted by 1 - min_val when min_val <= 0 so every value is positive.
+    Runs in place on one float64 buffer instead of allocating a temporary per operation.
+    """
+    out = series.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    if min_val <= 0:
+        out -= min_val
+        out += 1
+    np.log1p(out, out=out)
+    return out
+
 class DataPreprocessor:
     """Apply preprocessing transformations to datasets"""
     
@@ -23,7 +128,15 @@ class DataPreprocessor:
         file_id: str, 
         actions: List[PreprocessAction]
     ) -> PreprocessResponse:
-        """Apply user-selected preprocessing actions to dataset"""
+        """Apply user-selected preprocessing actions to dataset in a worker thread"""
+        return await to_thread.run_sync(self.preprocess_dataset_sync, file_id, actions)
+    
+    def preprocess_dataset_sync(
+        self, 
+        file_id: str, 
+        actions: List[PreprocessAction]
+    ) -> PreprocessResponse:
+        """Apply user-selected preprocessing actions to dataset (blocking)"""
         print(f"\n=== APPLYING SELECTED ACTIONS ===")
         print(f"File ID: {file_id}")
         print(f"Number of actions: {len(actions)}")
@@ -31,74 +144,19 @@ class DataPreprocessor:
         # Load failed columns metadata
         failed_skewness_columns = self._load_failed_columns(file_id)
         
+        # Freshly parsed and private to this call, so handlers may modify it in place
         df = self.file_handler.load_dataframe(file_id)
-        df = df.copy()
         original_rows = len(df)
         print(f"Original rows: {original_rows}")
         applied_actions = []
         
-        # Apply each selected action
-        for action in actions:
-            try:
-                print(f"\n→ Applying {action.issue_type.value} fix on {len(action.columns)} columns using '{action.method}'")
-                
-                # Handle skewness with failed column filtering
-                if action.issue_type == IssueType.SKEWNESS:
-                    # Filter out columns that have already failed
-                    fixable_columns = [col for col in action.columns if col not in failed_skewness_columns]
-                    if not fixable_columns:
-                        print(f"    → Skipping - all columns previously failed transformation")
-                        applied_actions.append({
-                            "issue_type": action.issue_type.value,
-                            "columns": action.columns,
-                            "method": action.method,
-                            "status": "skipped",
-                            "reason": "all_columns_unfixable"
-                        })
-                        continue
-                    action.columns = fixable_columns
-                
-                df_before = df.copy()
-                df = self._apply_action(df, action)
-                
-                # Check if skewness transformation actually worked
-                if action.issue_type == IssueType.SKEWNESS:
-                    if df.equals(df_before):
-                        print(f"    ⚠️ Skewness transformation failed for {action.columns}")
-                        print(f"    → Removing unfixable columns: {action.columns}")
-                        
-                        # Drop unfixable columns
-                        df = df.drop(columns=action.columns, errors='ignore')
-                        
-                        # Save to metadata
-                        failed_skewness_columns.update(action.columns)
-                        self._save_failed_columns(file_id, failed_skewness_columns)
-                        
-                        applied_actions.append({
-                            "issue_type": action.issue_type.value,
-                            "columns": action.columns,
-                            "method": "remove_column",
-                            "status": "removed",
-                            "reason": "transformation_ineffective"
-                        })
-                        continue
-                
-                print(f"  ✓ Success - Rows after: {len(df)}")
-                applied_actions.append({
-                    "issue_type": action.issue_type.value,
-                    "columns": action.columns,
-                    "method": action.method,
-                    "status": "success"
-                })
-            except Exception as e:
-                print(f"  ✗ Failed: {str(e)}") 
-                applied_actions.append({
-                    "issue_type": action.issue_type.value,
-                    "columns": action.columns,
-                    "method": action.method,
-                    "status": "failed",
-                    "error": str(e)
-                })
+        # Apply the selected actions in order; runs of column-local actions on
+        # disjoint columns are applied side by side
+        for batch in self._batch_actions(actions):
+            if len(batch) == 1 and len(self._column_groups(batch[0])) == 1:
+                df = self._run_action(df, batch[0], file_id, failed_skewness_columns, applied_actions)
+            else:
+                df = self._run_action_batch(df, batch, file_id, failed_skewness_columns, applied_actions)
         
         # Save processed data
         processed_path = self.file_handler.save_processed_dataframe(file_id, df)
@@ -115,9 +173,6 @@ class DataPreprocessor:
         print(f"=== PREPROCESSING COMPLETE ===\n")
         
         # Create full AnalysisResponse for frontend (same format as /api/analyze)
-        from app.models.schemas import AnalysisResponse, FileInfo
-        import os
-        
         file_path = self.file_handler._get_file_path(file_id)
         if not os.path.exists(file_path):
             # Use processed file path
@@ -167,6 +222,224 @@ class DataPreprocessor:
             analysis=analysis_response  # Full analysis for frontend to update UI
         )
     
+    def _is_column_local(self, action: PreprocessAction) -> bool:
+        """Whether an action only rewrites its own columns, keeping every row and every other column"""
+        methods = COLUMN_LOCAL_METHODS.get(action.issue_type)
+        if methods is None:
+            return False
+        return not methods or self._normalize_method_name(action.method, action.issue_type) in methods
+    
+    def _batch_actions(self, actions: List[PreprocessAction]) -> List[List[PreprocessAction]]:
+        """
+        Split actions into consecutive batches that can run concurrently: column-local actions
+        with pairwise disjoint columns share a batch, any other action runs on its own
+        """
+        batches = []
+        batch, batch_columns = [], set()
+        for action in actions:
+            columns = set(action.columns)
+            if self._is_column_local(action) and not (columns & batch_columns):
+                batch.append(action)
+                batch_columns |= columns
+                continue
+            
+            if batch:
+                batches.append(batch)
+            if self._is_column_local(action):
+                batch, batch_columns = [action], columns
+            else:
+                batches.append([action])
+                batch, batch_columns = [], set()
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _column_groups(self, action: PreprocessAction) -> List[List[str]]:
+        """
+        Split the columns of a wide per-column action into contiguous groups, one per worker;
+        a single group when the action cannot or need not be split
+        """
+        columns = action.columns
+        n_groups = min(ACTION_WORKERS, len(columns))
+        # Repeated columns are transformed once per mention, so they must stay in one group
+        if (n_groups < 2 or action.issue_type not in COLUMN_SPLIT_TYPES
+                or len(set(columns)) != len(columns) or not self._is_column_local(action)):
+            return [columns]
+        
+        size, extra = divmod(len(columns), n_groups)
+        groups, start = [], 0
+        for i in range(n_groups):
+            end = start + size + (1 if i < extra else 0)
+            groups.append(columns[start:end])
+            start = end
+        return groups
+    
+    def _prepare_action(self, action: PreprocessAction, failed_skewness_columns: set) -> Optional[Dict[str, Any]]:
+        """Announce an action and drop previously failed skewness columns; returns a skip record if nothing is left"""
+        print(f"\n→ Applying {action.issue_type.value} fix on {len(action.columns)} columns using '{action.method}'")
+        
+        # Handle skewness with failed column filtering
+        if action.issue_type == IssueType.SKEWNESS:
+            # Filter out columns that have already failed
+            fixable_columns = [col for col in action.columns if col not in failed_skewness_columns]
+            if not fixable_columns:
+                print(f"    → Skipping - all columns previously failed transformation")
+                return {
+                    "issue_type": action.issue_type.value,
+                    "columns": action.columns,
+                    "method": action.method,
+                    "status": "skipped",
+                    "reason": "all_columns_unfixable"
+                }
+            action.columns = fixable_columns
+        
+        return None
+    
+    def _finish_action(
+        self,
+        df: pd.DataFrame,
+        action: PreprocessAction,
+        unchanged: bool,
+        file_id: str,
+        failed_skewness_columns: set,
+        applied_actions: List[Dict[str, Any]]
+    ) -> pd.DataFrame:
+        """Record an applied action, removing skewed columns the transformation left untouched"""
+        # Check if skewness transformation actually worked
+        if action.issue_type == IssueType.SKEWNESS and unchanged:
+            print(f"    ⚠️ Skewness transformation failed for {action.columns}")
+            print(f"    → Removing unfixable columns: {action.columns}")
+            
+            # Drop unfixable columns
+            df = df.drop(columns=action.columns, errors='ignore')
+            
+            # Save to metadata
+            failed_skewness_columns.update(action.columns)
+            self._save_failed_columns(file_id, failed_skewness_columns)
+            
+            applied_actions.append({
+                "issue_type": action.issue_type.value,
+                "columns": action.columns,
+                "method": "remove_column",
+                "status": "removed",
+                "reason": "transformation_ineffective"
+            })
+            return df
+        
+        print(f"  ✓ Success - Rows after: {len(df)}")
+        applied_actions.append({
+            "issue_type": action.issue_type.value,
+            "columns": action.columns,
+            "method": action.method,
+            "status": "success"
+        })
+        return df
+    
+    def _skewness_snapshot(self, df: pd.DataFrame, action: PreprocessAction) -> Optional[pd.DataFrame]:
+        """
+        Copy of the columns a skewness action may transform, to tell afterwards whether it changed
+        anything; the handler touches nothing else, so the rest of the frame needs no copy
+        """
+        if action.issue_type != IssueType.SKEWNESS:
+            return None
+        return df[[col for col in dict.fromkeys(action.columns) if col in df.columns]].copy()
+    
+    def _record_failure(self, action: PreprocessAction, error: Exception, applied_actions: List[Dict[str, Any]]):
+        """Record an action that raised"""
+        print(f"  ✗ Failed: {str(error)}")
+        applied_actions.append({
+            "issue_type": action.issue_type.value,
+            "columns": action.columns,
+            "method": action.method,
+            "status": "failed",
+            "error": str(error)
+        })
+    
+    def _run_action(
+        self,
+        df: pd.DataFrame,
+        action: PreprocessAction,
+        file_id: str,
+        failed_skewness_columns: set,
+        applied_actions: List[Dict[str, Any]]
+    ) -> pd.DataFrame:
+        """Apply one action to the whole frame and record the outcome"""
+        skipped = self._prepare_action(action, failed_skewness_columns)
+        if skipped is not None:
+            applied_actions.append(skipped)
+            return df
+        
+        try:
+            before = self._skewness_snapshot(df, action)
+            df = self._apply_action(df, action)
+            return self._finish_action(
+                df, action, before is not None and df[before.columns].equals(before),
+                file_id, failed_skewness_columns, applied_actions
+            )
+        except Exception as e:
+            self._record_failure(action, e, applied_actions)
+            return df
+    
+    def _apply_action_to_columns(self, sub: pd.DataFrame, action: PreprocessAction) -> Tuple[pd.DataFrame, Optional[Exception]]:
+        """Apply a column-local action to a frame holding just its columns (run on a worker thread)"""
+        try:
+            return self._apply_action(sub, action), None
+        except Exception as e:
+            # Handlers edit the frame in place, so keep whatever they changed before failing
+            return sub, e
+    
+    def _run_action_batch(
+        self,
+        df: pd.DataFrame,
+        batch: List[PreprocessAction],
+        file_id: str,
+        failed_skewness_columns: set,
+        applied_actions: List[Dict[str, Any]]
+    ) -> pd.DataFrame:
+        """
+        Apply column-local actions on disjoint columns concurrently, each column group to its
+        own copy of just its columns, then write the results back and record them in action order
+        """
+        skipped = [self._prepare_action(action, failed_skewness_columns) for action in batch]
+        
+        # Column subsets are taken here, on this thread, so workers never touch the shared frame
+        before, futures = {}, {}
+        for i, action in enumerate(batch):
+            if skipped[i] is None:
+                before[i] = self._skewness_snapshot(df, action)
+                futures[i] = []
+                for group in self._column_groups(action):
+                    sub = df[[col for col in dict.fromkeys(group) if col in df.columns]].copy()
+                    part = action if group is action.columns else action.model_copy(update={"columns": group})
+                    futures[i].append(_action_executor.submit(self._apply_action_to_columns, sub, part))
+        
+        for i, action in enumerate(batch):
+            if skipped[i] is not None:
+                applied_actions.append(skipped[i])
+                continue
+            
+            # Every group's changes are kept; the first group that raised fails the action
+            error = None
+            for future in futures[i]:
+                result, group_error = future.result()
+                for col in result.columns:
+                    df[col] = result[col]
+                error = error or group_error
+            
+            if error is not None:
+                self._record_failure(action, error, applied_actions)
+                continue
+            try:
+                df = self._finish_action(
+                    df, action, before[i] is not None and df[before[i].columns].equals(before[i]),
+                    file_id, failed_skewness_columns, applied_actions
+                )
+            except Exception as e:
+                self._record_failure(action, e, applied_actions)
+        
+        return df
+    
     def _normalize_method_name(self, method: str, issue_type: IssueType) -> str:
         """Normalize frontend method names to backend format"""
         method_lower = method.lower().replace('_', ' ').replace('(', '').replace(')', '')
@@ -331,17 +604,24 @@ class DataPreprocessor:
         method: str
     ) -> pd.DataFrame:
         """Handle missing values"""
-        df = df.copy()  # Ensure we're working with a copy
+        # Shallow copy: filled columns are assigned as new arrays, so the caller's frame is never written
+        df = df.copy(deep=False)
         
-        for col in columns:
+        present = []
+        for col in dict.fromkeys(columns):
             if col not in df.columns:
                 print(f"    WARNING: Column '{col}' not found in DataFrame")
                 continue
+            present.append(col)
+        
+        missing_before = df[present].isna().sum()
+        
+        # Group columns by the method actually applied, so each method runs once over all of them
+        methods = {}
+        for col in present:
+            print(f"    Column '{col}': {missing_before[col]} missing values")
             
-            missing_before = df[col].isna().sum()
-            print(f"    Column '{col}': {missing_before} missing values")
-            
-            if missing_before == 0:
+            if missing_before[col] == 0:
                 print(f"    No missing values to fix")
                 continue
             
@@ -350,63 +630,73 @@ class DataPreprocessor:
             if method in ["mean", "median"] and not pd.api.types.is_numeric_dtype(df[col]):
                 actual_method = "mode"
                 print(f"    ⚠️  Auto-adjusted: '{method}' → 'mode' (column is non-numeric)")
-            
-            if actual_method == "mean":
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    mean_val = df[col].mean()
-                    df[col] = df[col].fillna(mean_val)
-                    print(f"    Filled with mean: {mean_val}")
-                else:
-                    print(f"    WARNING: Cannot use mean on non-numeric column, skipping")
-                    
-            elif actual_method == "median":
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    median_val = df[col].median()
-                    df[col] = df[col].fillna(median_val)
-                    print(f"    Filled with median: {median_val}")
-                else:
-                    print(f"    WARNING: Cannot use median on non-numeric column, skipping")
-                    
-            elif actual_method == "mode":
-                mode_val = df[col].mode()
-                if not mode_val.empty:
-                    df[col] = df[col].fillna(mode_val[0])
-                    print(f"    Filled with mode: {mode_val[0]}")
-                else:
-                    print(f"    WARNING: No mode found, skipping")
-                    
-            elif actual_method == "forward_fill":
+            methods.setdefault(actual_method, []).append(col)
+        
+        # Fill values for mean/median/mode columns, applied with a single fillna
+        fill_values = {}
+        for stat in ("mean", "median"):
+            if stat in methods:
+                stat_values = df[methods[stat]].agg(stat)
+                for col, value in stat_values.items():
+                    fill_values[col] = value
+                    print(f"    Filled {col} with {stat}: {value}")
+        
+        if "mode" in methods:
+            modes = df[methods["mode"]].mode()
+            for col in methods["mode"]:
+                # Missing entries in the first row mean the column has no mode
+                mode_val = modes[col].iloc[0] if len(modes) > 0 else np.nan
+                if pd.isna(mode_val):
+                    print(f"    WARNING: No mode found for {col}, skipping")
+                    continue
+                fill_values[col] = mode_val
+                print(f"    Filled {col} with mode: {mode_val}")
+        
+        # One column at a time; df.fillna(dict) would deep-copy the whole frame first
+        for col, value in fill_values.items():
+            df[col] = df[col].fillna(value)
+        
+        # Also per column: filling each 1-D array beats filling a selected sub-frame and writing
+        # it back, which copies the block twice
+        if "forward_fill" in methods:
+            for col in methods["forward_fill"]:
                 df[col] = df[col].ffill()
-                print(f"    Applied forward fill")
-                
-            elif actual_method == "backward_fill":
+            print(f"    Applied forward fill to {len(methods['forward_fill'])} columns")
+        
+        if "backward_fill" in methods:
+            for col in methods["backward_fill"]:
                 df[col] = df[col].bfill()
-                print(f"    Applied backward fill")
+            print(f"    Applied backward fill to {len(methods['backward_fill'])} columns")
+        
+        if "drop" in methods:
+            rows_before = len(df)
+            df = df.dropna(subset=methods["drop"])
+            print(f"    Dropped {rows_before - len(df)} rows")
+        
+        # Report per column how much was fixed
+        for actual_method, cols in methods.items():
+            missing_after = df[cols].isna().sum()
+            for col in cols:
+                fixed_count = missing_before[col] - missing_after[col]
+                print(f"    {col} after {actual_method}: {missing_after[col]} missing values (fixed {fixed_count})")
                 
-            elif actual_method == "drop":
-                rows_before = len(df)
-                df = df.dropna(subset=[col])
-                rows_dropped = rows_before - len(df)
-                print(f"    Dropped {rows_dropped} rows")
-            
-            missing_after = df[col].isna().sum()
-            fixed_count = missing_before - missing_after
-            print(f"    After {actual_method}: {missing_after} missing values (fixed {fixed_count})")
-            
-            # Only warn if we actually tried to fix it and failed
-            if missing_after > 0 and actual_method not in ["forward_fill", "backward_fill"] and fixed_count == 0:
-                print(f"    WARNING: Still has {missing_after} missing values after {actual_method}!")
+                # Only warn if we actually tried to fix it and failed
+                if missing_after[col] > 0 and actual_method not in ["forward_fill", "backward_fill"] and fixed_count == 0:
+                    print(f"    WARNING: Still has {missing_after[col]} missing values after {actual_method}!")
         
         return df
     
     def _handle_duplicates(self, df: pd.DataFrame, method: str) -> pd.DataFrame:
         """Handle duplicate rows"""
         if method == "remove":
-            duplicates_before = df.duplicated().sum()
+            # Hash the rows once and reuse the mask; keeping only first occurrences
+            # leaves no duplicates behind, so there is nothing to re-check
+            duplicate_mask = df.duplicated()
+            duplicates_before = int(duplicate_mask.sum())
             print(f"    Duplicates before: {duplicates_before}")
-            df = df.drop_duplicates()
-            duplicates_after = df.duplicated().sum()
-            print(f"    Duplicates after: {duplicates_after} (removed {duplicates_before - duplicates_after})")
+            if duplicates_before:
+                df = df[~duplicate_mask]
+            print(f"    Duplicates after: 0 (removed {duplicates_before})")
         return df
     
     def _handle_outliers(
@@ -416,7 +706,8 @@ class DataPreprocessor:
         method: str
     ) -> pd.DataFrame:
         """Handle outliers"""
-        for col in columns:
+        numeric_cols = []
+        for col in dict.fromkeys(columns):
             if col not in df.columns:
                 print(f"    Column '{col}' not found")
                 continue
@@ -426,42 +717,53 @@ class DataPreprocessor:
                 print(f"    Skipping non-numeric column '{col}'")
                 continue
             
-            if method == "remove":
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                outliers_before = ((df[col] < lower_bound) | (df[col] > upper_bound)).sum()
-                df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-                print(f"    Column '{col}': Removed {outliers_before} outliers (rows: {len(df)})")
+            numeric_cols.append(col)
+        
+        if not numeric_cols:
+            return df
+        
+        if method in ("remove", "cap"):
+            # IQR bounds for all columns at once, from the data as passed in
+            # (Use SAME threshold as detection: 1.5*IQR); the shared kernel sorts the matrix
+            # once and matches pandas' quantile exactly
+            values = df[numeric_cols]
+            mat = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            Q1, Q3 = nan_quantiles(mat, (0.25, 0.75))
+            IQR = Q3 - Q1
+            lower_bounds = Q1 - 1.5 * IQR
+            upper_bounds = Q3 + 1.5 * IQR
             
-            elif method == "cap":
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                
-                # Use SAME threshold as detection (1.5*IQR) or tighter
-                # Cap at 1.5*IQR to match detection threshold
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
-                outliers_before = ((df[col] < lower_bound) | (df[col] > upper_bound)).sum()
-                
-                # Actually cap the values
-                df[col] = df[col].clip(lower=lower_bound, upper=upper_bound)
-                
-                # Verify outliers are gone
-                outliers_after = ((df[col] < lower_bound) | (df[col] > upper_bound)).sum()
-                print(f"    Column '{col}': Capped {outliers_before} outliers → {outliers_after} remaining")
+            outliers_before = ((mat < lower_bounds) | (mat > upper_bounds)).sum(axis=0)
             
-            elif method == "log_transform":
+            if method == "remove":
+                # One combined row mask; rows with NaN in a target column fail it too
+                keep = ((mat >= lower_bounds) & (mat <= upper_bounds)).all(axis=1)
+                df = df[keep]
+                for col, count in zip(numeric_cols, outliers_before):
+                    print(f"    Column '{col}': Removed {count} outliers (rows: {len(df)})")
+            else:
+                # Actually cap the values. float64 columns are clipped straight from the matrix
+                # (NaN bounds mean no bound, as in pandas); other dtypes keep pandas' clip for
+                # its dtype rules
+                is_float = (values.dtypes == np.float64).to_numpy()
+                if is_float.any():
+                    float_cols = [col for col, f in zip(numeric_cols, is_float) if f]
+                    df[float_cols] = np.clip(
+                        mat if is_float.all() else mat[:, is_float],
+                        np.nan_to_num(lower_bounds[is_float], nan=-np.inf),
+                        np.nan_to_num(upper_bounds[is_float], nan=np.inf)
+                    )
+                if not is_float.all():
+                    df[values.columns[~is_float]] = values.loc[:, ~is_float].clip(
+                        lower=lower_bounds[~is_float], upper=upper_bounds[~is_float], axis=1
+                    )
+                for col, count in zip(numeric_cols, outliers_before):
+                    print(f"    Column '{col}': Capped {count} outliers → 0 remaining")
+        
+        elif method == "log_transform":
+            for col in numeric_cols:
                 # Add small constant to avoid log(0)
-                min_val = df[col].min()
-                if min_val <= 0:
-                    df[col] = np.log1p(df[col] - min_val + 1)
-                else:
-                    df[col] = np.log1p(df[col])
+                df[col] = _log1p_shifted(df[col], df[col].min())
                 print(f"    Column '{col}': Applied log transform to reduce outliers")
         
         return df
@@ -480,7 +782,7 @@ class DataPreprocessor:
         try:
             from imblearn.over_sampling import SMOTE, RandomOverSampler
             from imblearn.under_sampling import RandomUnderSampler
-            from sklearn.model_selection import train_test_split
+            from sklearn.neighbors import NearestNeighbors
             
             # Check for missing values in target column
             missing_in_target = df[target_column].isna().sum()
@@ -510,14 +812,31 @@ class DataPreprocessor:
                     print(f"    ⚠️  SMOTE requires at least 2 samples per class, found {min_samples}")
                     print(f"    → Falling back to RandomOverSampler")
                     sampler = RandomOverSampler(random_state=42)
+                    X_resampled, y_resampled = sampler.fit_resample(X_numeric, y)
                 else:
                     # Adjust k_neighbors based on minority class size
                     # Default k_neighbors=5, but must be < minority class size
                     k_neighbors = min(5, min_samples - 1)
                     print(f"    Using k_neighbors={k_neighbors} for SMOTE")
-                    sampler = SMOTE(random_state=42, k_neighbors=k_neighbors)
+                    # Pass a parallel neighbors estimator (n_neighbors includes the sample itself);
+                    # kd-tree degrades in high dimensions, so use brute force there
+                    algorithm = "brute" if X_numeric.shape[1] > 50 else "kd_tree"
+                    nn = NearestNeighbors(n_neighbors=k_neighbors + 1, algorithm=algorithm, n_jobs=-1)
+                    sampler = SMOTE(random_state=42, k_neighbors=nn)
+                    
+                    if _fits_float32(X_numeric):
+                        # Search and interpolate in float32 to halve neighbor-search memory. SMOTE returns
+                        # the original rows first, so keep those at full precision and only cast the
+                        # synthetic rows back to the original dtypes
+                        X_resampled, y_resampled = sampler.fit_resample(X_numeric.astype(np.float32), y)
+                        X_resampled = pd.concat(
+                            [X_numeric, X_resampled.iloc[len(X_numeric):].astype(X_numeric.dtypes)],
+                            ignore_index=True
+                        )
+                    else:
+                        # float32 would round large values (e.g. IDs above 2**24) in the synthetic rows
+                        X_resampled, y_resampled = sampler.fit_resample(X_numeric, y)
                 
-                X_resampled, y_resampled = sampler.fit_resample(X_numeric, y)
                 print(f"    ✓ Applied SMOTE: {len(df)} → {len(y_resampled)} rows")
             elif method == "oversample":
                 sampler = RandomOverSampler(random_state=42)
@@ -531,9 +850,9 @@ class DataPreprocessor:
                 print(f"    Unknown method: {method}")
                 return df
             
-            # Reconstruct dataframe
-            df_resampled = pd.DataFrame(X_resampled, columns=X_numeric.columns)
-            df_resampled[target_column] = y_resampled
+            # Samplers return a DataFrame for DataFrame input, no need to re-wrap
+            df_resampled = X_resampled.reset_index(drop=True)
+            df_resampled[target_column] = np.asarray(y_resampled)
             return df_resampled
             
         except ImportError:
@@ -552,6 +871,34 @@ class DataPreprocessor:
         method: str
     ) -> pd.DataFrame:
         """Handle categorical data issues"""
+        if method == "one_hot":
+            # Build every column's dummies, then join them in one concat instead of
+            # rebuilding the whole frame once per encoded column
+            encoded = [col for col in dict.fromkeys(columns) if col in df.columns]
+            if not encoded:
+                return df
+            
+            # Dummies are dense (one byte per cell), and every later step expects dense columns; refuse
+            # up front rather than run out of memory (one column per category plus one for NaN)
+            cardinality = {col: df[col].nunique() for col in encoded}
+            new_cells = len(df) * sum(unique_vals + 1 for unique_vals in cardinality.values())
+            if new_cells > settings.ONE_HOT_MAX_CELLS:
+                raise ValueError(
+                    f"One-hot encoding {encoded} would add {new_cells:,} cells "
+                    f"(limit {settings.ONE_HOT_MAX_CELLS:,}); use label encoding or group rare categories first"
+                )
+            
+            dummies = []
+            for col in encoded:
+                unique_vals = cardinality[col]
+                if unique_vals > ONE_HOT_WARN_CARDINALITY:
+                    print(f"    WARNING: Column '{col}' has {unique_vals} categories; one-hot output will be wide")
+                # bool dummies are already one byte per cell
+                dummies.append(pd.get_dummies(df[col], prefix=col, dummy_na=True))
+                print(f"    Column '{col}': One-hot encoded to {unique_vals} new columns")
+            
+            return pd.concat([df.drop(columns=encoded), *dummies], axis=1)
+        
         for col in columns:
             if col not in df.columns:
                 continue
@@ -571,21 +918,12 @@ class DataPreprocessor:
                 print(f"    Column '{col}': Normalized - {unique_before} → {unique_after} unique values")
             
             elif method == "label_encode":
-                le = LabelEncoder()
-                # Handle NaN by filling temporarily, then restoring
+                # Handle NaN by filling temporarily, then restoring; sorted factorize
+                # gives the same codes as LabelEncoder in a single hashing pass
                 na_mask = df[col].isna()
-                df[col] = df[col].fillna('__MISSING__')
-                df[col] = le.fit_transform(df[col].astype(str))
+                df[col], _ = pd.factorize(df[col].fillna('__MISSING__').astype(str), sort=True)
                 df.loc[na_mask, col] = np.nan
                 print(f"    Column '{col}': Label encoded to {df[col].nunique()} numeric values")
-            
-            elif method == "one_hot":
-                unique_vals = df[col].nunique()
-                dummies = pd.get_dummies(df[col], prefix=col, dummy_na=True)
-                df = pd.concat([df.drop(col, axis=1), dummies], axis=1)
-                print(f"    Column '{col}': One-hot encoded to {unique_vals} new columns")
-        
-        return df
         
         return df
     
@@ -601,21 +939,26 @@ class DataPreprocessor:
             if col not in df.columns:
                 continue
             
+            if method not in ("convert", "extract"):
+                continue
+            
+            # Parse once; a known source format skips per-value format inference, most of the parse time
+            parsed = pd.to_datetime(df[col], errors='coerce', format=parameters.get('source_format'))
+            
             if method == "convert":
-                df[col] = pd.to_datetime(df[col], errors='coerce')
                 target_format = parameters.get('format', '%Y-%m-%d')
-                df[col] = df[col].dt.strftime(target_format)
+                df[col] = parsed.dt.strftime(target_format)
             
-            elif method == "extract":
-                df[col] = pd.to_datetime(df[col], errors='coerce')
+            else:
+                df[col] = parsed
                 extract_parts = parameters.get('parts', ['year', 'month', 'day'])
                 
                 if 'year' in extract_parts:
-                    df[f'{col}_year'] = df[col].dt.year
+                    df[f'{col}_year'] = parsed.dt.year
                 if 'month' in extract_parts:
-                    df[f'{col}_month'] = df[col].dt.month
+                    df[f'{col}_month'] = parsed.dt.month
                 if 'day' in extract_parts:
-                    df[f'{col}_day'] = df[col].dt.day
+                    df[f'{col}_day'] = parsed.dt.day
         
         return df
     
@@ -635,15 +978,11 @@ class DataPreprocessor:
                 print(f"    Column '{col}': Converted to lowercase")
             
             elif method == "remove_punctuation":
-                df[col] = df[col].astype(str).str.replace(r'[^\w\s]', '', regex=True)
+                df[col] = df[col].astype(str).str.replace(PUNCTUATION_RE, '', regex=True)
                 print(f"    Column '{col}': Removed punctuation")
             
             elif method == "remove_stopwords":
-                # Simple stopword removal (can be enhanced with NLTK)
-                stopwords = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'}
-                df[col] = df[col].apply(
-                    lambda x: ' '.join([word for word in str(x).split() if word.lower() not in stopwords])
-                )
+                df[col] = _remove_stopwords(df[col])
                 print(f"    Column '{col}': Removed stopwords")
         
         return df
@@ -666,9 +1005,10 @@ class DataPreprocessor:
                 continue
             
             # Calculate skewness before
-            skew_before = df[col].skew()
-            unique_vals = df[col].nunique()
-            col_min, col_max = df[col].min(), df[col].max()
+            series = df[col]
+            skew_before = series.skew()
+            unique_vals = series.nunique()
+            col_min, col_max = series.min(), series.max()
             variation = col_max - col_min
             
             print(f"    Column '{col}': Original skewness = {skew_before:.2f}, unique values = {unique_vals}, variation = {variation:.4f}")
@@ -682,54 +1022,45 @@ class DataPreprocessor:
                 print(f"    Column '{col}': Insufficient variation ({variation:.4f}), skipping transform")
                 continue
             
-            # Store original column to restore if transform doesn't improve skewness
-            original_col = df[col].copy()
             original_skew = abs(skew_before)
             
-            # Always try log transform first
-            min_val = df[col].min()
-            if min_val <= 0:
-                df[col] = np.log1p(df[col] - min_val + 1)
-            else:
-                df[col] = np.log1p(df[col])
+            # Always try log transform first. Work on an array and only write it back once
+            # accepted, so a rejected transform needs no copy/restore of the column
+            transformed = _log1p_shifted(series, col_min)
+            log_min, log_max = np.nanmin(transformed), np.nanmax(transformed)
             
             # Check if log transform created constant/near-constant column
-            log_variation = df[col].max() - df[col].min()
-            if log_variation < 0.01:
+            if log_max - log_min < 0.01:
                 print(f"    Column '{col}': Log transform created constant column, restoring original")
-                df[col] = original_col
                 continue
                 
-            skew_after_log = df[col].skew()
+            skew_after_log = pd.Series(transformed).skew()
             print(f"    Column '{col}': After log transform = {skew_after_log:.2f}")
             
             # If log transform didn't improve skewness significantly, restore and skip
             if abs(skew_after_log) >= original_skew * 0.90:  # Less than 10% improvement
                 print(f"    Column '{col}': Log transform didn't improve skewness enough ({abs(skew_after_log):.2f} vs {original_skew:.2f}), restoring original")
-                df[col] = original_col
                 continue
             
             # If still significantly skewed, try box-cox
             if abs(skew_after_log) > 0.9:  # Slightly lower threshold for box-cox attempt
                 try:
-                    from scipy import stats
-                    # Box-Cox requires positive values and variation
-                    min_val_bc = df[col].min()
-                    max_val_bc = df[col].max()
-                    
-                    # Check if there's enough variation for box-cox
-                    if max_val_bc - min_val_bc < 0.01:
+                    # Box-Cox requires positive values and variation (the log result's range is already known)
+                    if log_max - log_min < 0.01:
                         print(f"    Column '{col}': Insufficient variation for box-cox, keeping log transform")
+                        df[col] = transformed
                         continue
                     
-                    if min_val_bc <= 0:
-                        df[col] = df[col] - min_val_bc + 1
-                    df[col] = stats.boxcox(df[col])[0]
+                    if log_min <= 0:
+                        transformed = transformed - log_min + 1
+                    df[col] = stats.boxcox(transformed)[0]
                     skew_final = df[col].skew()
                     print(f"    Column '{col}': After box-cox = {skew_final:.2f} ✓")
                 except Exception as e:
+                    df[col] = transformed
                     print(f"    Column '{col}': Box-cox failed: {str(e)[:100]}, keeping log transform")
             else:
+                df[col] = transformed
                 print(f"    Column '{col}': Log transform sufficient ✓")
         
         return df
@@ -745,26 +1076,25 @@ class DataPreprocessor:
         method: str
     ) -> pd.DataFrame:
         """Apply scaling to numerical columns"""
-        for col in columns:
-            if col not in df.columns:
-                continue
-            
-            if method == "minmax":
-                scaler = MinMaxScaler()
-                df[col] = scaler.fit_transform(df[[col]])
-            
-            elif method == "standard":
-                scaler = StandardScaler()
-                df[col] = scaler.fit_transform(df[[col]])
-            
-            elif method == "robust":
-                scaler = RobustScaler()
-                df[col] = scaler.fit_transform(df[[col]])
+        scaler_class = SCALERS.get(method)
+        columns = [col for col in dict.fromkeys(columns) if col in df.columns]
+        if scaler_class is None or not columns:
+            return df
+        
+        # Scalers work column by column, so one fit over all columns matches per-column fits
+        df[columns] = scaler_class().fit_transform(df[columns])
         
         return df
     
     async def fix_all_issues(self, file_id: str) -> PreprocessResponse:
-        """Automatically fix all detected issues with iterative refinement"""
+        """Automatically fix all detected issues in a worker thread"""
+        return await to_thread.run_sync(self.fix_all_issues_sync, file_id)
+    
+    def fix_all_issues_sync(self, file_id: str, before_save: Optional[Callable[[], None]] = None) -> PreprocessResponse:
+        """
+        Automatically fix all detected issues with iterative refinement (blocking).
+        before_save, if given, runs right before the processed file is written and may raise to abort.
+        """
         print(f"\\n=== ANALYZING DATA FOR AUTO-FIX ===")
         
         # Load initial data
@@ -777,6 +1107,9 @@ class DataPreprocessor:
         # Load previously failed skewness columns for this file
         failed_skewness_columns = self._load_failed_columns(file_id)
         
+        # Issues of the current df; None once fixes have changed it since the last analysis
+        issues = None
+        
         while iteration < max_iterations:
             iteration += 1
             print(f"\\n{'='*50}")
@@ -831,17 +1164,25 @@ class DataPreprocessor:
             }
             actions.sort(key=lambda a: action_order.get(a.issue_type, 99))
             
-            # Apply actions to dataframe
-            df = df.copy()
+            # Apply actions to dataframe (load_dataframe parsed a fresh frame, private to this call,
+            # so handlers may modify it in place). Adjacent column removals are collected and
+            # applied with one drop, rebuilding the frame once instead of once per action
+            issues = None
+            pending_removals = []
             for action in actions:
+                if action.issue_type in COLUMN_REMOVAL_TYPES:
+                    pending_removals.append(action)
+                    continue
+                df = self._remove_columns_together(df, pending_removals, iteration, all_applied_actions)
+                
                 try:
-                    df_before = df.copy()
+                    before = self._skewness_snapshot(df, action)
                     df = self._apply_action(df, action)
                     
                     # Check if skewness action actually changed the data
-                    if action.issue_type == IssueType.SKEWNESS:
-                        # If DataFrame didn't change, transformation failed
-                        if df.equals(df_before):
+                    if before is not None:
+                        # If the columns didn't change, transformation failed
+                        if df[before.columns].equals(before):
                             print(f"    ⚠️ Skewness transformation failed for {action.columns}")
                             print(f"    → Removing unfixable columns: {action.columns}")
                             
@@ -879,15 +1220,22 @@ class DataPreprocessor:
                         "status": "failed",
                         "error": str(e)
                     })
+            
+            df = self._remove_columns_together(df, pending_removals, iteration, all_applied_actions)
         
         # Save final processed data
         print(f"\\n{'='*50}")
         print(f"FINAL SAVE: Saving cleaned data...")
         print(f"{'='*50}")
+        if before_save is not None:
+            before_save()
         processed_path = self.file_handler.save_processed_dataframe(file_id, df)
         
-        # Get final issue count and check for imbalanced data (exclude failed skewness columns)
-        final_issues = self._analyze_dataframe(df, exclude_skewness_columns=failed_skewness_columns)
+        # Get final issue count and check for imbalanced data (exclude failed skewness columns).
+        # The loop usually stops right after analyzing the final df, so only re-scan if fixes ran since
+        final_issues = issues
+        if final_issues is None:
+            final_issues = self._analyze_dataframe(df, exclude_skewness_columns=failed_skewness_columns)
         has_imbalanced_data = any(issue.type == IssueType.IMBALANCED_DATA for issue in final_issues)
         imbalanced_columns = None
         if has_imbalanced_data:
@@ -914,6 +1262,33 @@ class DataPreprocessor:
             }
         )
     
+    def _remove_columns_together(
+        self,
+        df: pd.DataFrame,
+        actions: List[PreprocessAction],
+        iteration: int,
+        applied_actions: List[Dict[str, Any]]
+    ) -> pd.DataFrame:
+        """Apply queued column-removal actions with a single drop, then empty the queue"""
+        if not actions:
+            return df
+        
+        to_remove = []
+        for action in actions:
+            columns = self._columns_removed_by(action)
+            print(f"  → Applying {action.issue_type.value} fix: removing {len(columns)} columns {columns}")
+            to_remove.extend(columns)
+            applied_actions.append({
+                "iteration": iteration,
+                "issue_type": action.issue_type.value,
+                "columns": action.columns,
+                "method": action.method,
+                "status": "success"
+            })
+        actions.clear()
+        
+        return self._remove_columns(df, list(dict.fromkeys(to_remove)))
+    
     def _load_failed_columns(self, file_id: str) -> set:
         """Load previously failed skewness columns for this file"""
         metadata_file = os.path.join(self.metadata_dir, f"{file_id}_failed_columns.json")
@@ -945,13 +1320,14 @@ class DataPreprocessor:
         """Analyze a DataFrame and return list of issues (without file I/O)"""
         issues = []
         
-        # Check all issue types directly on DataFrame
-        outlier_issues = self.analyzer._check_outliers(df)
+        # Check all issue types directly on DataFrame, sharing one dtype scan and numeric matrix
+        profile = ColumnProfile(df)
+        outlier_issues = self.analyzer._check_outliers(df, profile)
         if outlier_issues:
             print(f"    [DETECTION] Found {len(outlier_issues[0].affected_columns)} columns with outliers")
         issues.extend(outlier_issues)
         
-        skewness_issues = self.analyzer._check_skewness(df)
+        skewness_issues = self.analyzer._check_skewness(df, profile=profile)
         if skewness_issues:
             # Filter out columns that have been marked as unfixable
             if exclude_skewness_columns:
@@ -971,17 +1347,17 @@ class DataPreprocessor:
             print(f"    [DETECTION] Found {len(skewness_issues[0].affected_columns) if skewness_issues else 0} columns with skewness (after excluding unfixable)")
         issues.extend(skewness_issues)
         
-        issues.extend(self.analyzer._check_missing_values(df))
-        issues.extend(self.analyzer._check_duplicates(df))
-        issues.extend(self.analyzer._check_data_types(df))
-        issues.extend(self.analyzer._check_categorical_issues(df))
-        issues.extend(self.analyzer._check_constant_features(df))
-        issues.extend(self.analyzer._check_correlated_features(df))
+        issues.extend(self.analyzer._check_missing_values(df, profile))
+        issues.extend(self.analyzer._check_duplicates(df, profile))
+        issues.extend(self.analyzer._check_data_types(df, profile))
+        issues.extend(self.analyzer._check_categorical_issues(df, profile))
+        issues.extend(self.analyzer._check_constant_features(df, profile))
+        issues.extend(self.analyzer._check_correlated_features(df, profile))
         # Skewness already checked above - don't check twice!
-        issues.extend(self.analyzer._check_high_cardinality(df))
-        issues.extend(self.analyzer._check_date_formats(df))
-        issues.extend(self.analyzer._check_text_issues(df))
-        issues.extend(self.analyzer._check_imbalanced_data(df))
+        issues.extend(self.analyzer._check_high_cardinality(df, profile))
+        issues.extend(self.analyzer._check_date_formats(df, profile))
+        issues.extend(self.analyzer._check_text_issues(df, profile))
+        issues.extend(self.analyzer._check_imbalanced_data(df, profile))
         
         return issues
     
@@ -1049,11 +1425,15 @@ class DataPreprocessor:
             if method == "group_rare":
                 # Group categories that appear less than 1% of the time
                 threshold = len(df) * 0.01
-                value_counts = df[col].value_counts()
-                rare_categories = value_counts[value_counts < threshold].index
-                if len(rare_categories) > 0:
-                    df[col] = df[col].replace(rare_categories, 'Other')
-                    print(f"    Column '{col}': Grouped {len(rare_categories)} rare categories into 'Other'")
+                # One hashing pass gives both the counts and each row's category code
+                codes, uniques = pd.factorize(df[col])
+                rare = np.bincount(codes[codes >= 0], minlength=len(uniques)) < threshold
+                n_rare = int(rare.sum())
+                if n_rare > 0:
+                    # Look up each row's code in the rare table; missing values (code -1) are kept
+                    rare_rows = np.append(rare, False)[codes]
+                    df[col] = df[col].where(~rare_rows, 'Other')
+                    print(f"    Column '{col}': Grouped {n_rare} rare categories into 'Other'")
         
         return df
     
@@ -1064,13 +1444,22 @@ class DataPreprocessor:
     ) -> pd.DataFrame:
         """Handle highly correlated features by removing one from each pair"""
         if len(columns) > 0:
-            # Remove the first column from each correlated pair
-            cols_to_remove = columns[:len(columns)//2]  # Remove half of correlated features
+            cols_to_remove = self._correlated_columns_to_remove(columns)
             df = df.drop(columns=[col for col in cols_to_remove if col in df.columns])
             print(f"    Removed {len(cols_to_remove)} correlated features: {cols_to_remove}")
         
         return df
     
+    def _correlated_columns_to_remove(self, columns: List[str]) -> List[str]:
+        """Remove the first column from each correlated pair (half of the correlated features)"""
+        return columns[:len(columns)//2]
+    
+    def _columns_removed_by(self, action: PreprocessAction) -> List[str]:
+        """Columns a constant-value or correlated-feature action drops"""
+        if action.issue_type == IssueType.CORRELATED_FEATURES:
+            return self._correlated_columns_to_remove(action.columns)
+        return action.columns
+    
     def _handle_inconsistent_types(
         self, 
         df: pd.DataFrame, 
@@ -1114,9 +1503,6 @@ class DataPreprocessor:
     def _update_file_status(self, file_id: str, status: str):
         """Update file status in database"""
         try:
-            from app.models.database import File as DBFile
-            from app.database import get_db
-            
             db = next(get_db())
             try:
                 db_file = db.query(DBFile).filter(DBFile.file_id == file_id).first()
@@ -1,10 +1,12 @@
-from fastapi import UploadFile
 import pandas as pd
 import numpy as np
 import os
+from pathlib import Path
+from typing import List, Optional, Tuple
 from app.core.config import settings
 from app.models.schemas import FileInfo
-import aiofiles
+
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB
 
 class FileHandler:
     """Handle file upload, storage, and retrieval"""
@@ -13,33 +15,24 @@ class FileHandler:
         self.upload_dir = settings.UPLOAD_DIR
         self.temp_dir = settings.TEMP_DIR
     
-    async def save_uploaded_file(self, file: UploadFile, file_id: str) -> FileInfo:
-        """Save uploaded file and return file info"""
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        file_path = os.path.join(self.upload_dir, f"{file_id}{file_ext}")
-        
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as out_file:
-            content = await file.read()
-            await out_file.write(content)
-        
+    async def describe_uploaded_file(
+        self, file_path: str, file_id: str, filename: str, file_type: str, file_size: int
+    ) -> FileInfo:
+        """Return file info for an upload already written to file_path"""
         # Load data to get info
         df = self._load_dataframe(file_path)
         
-        # Get file size
-        file_size = os.path.getsize(file_path)
-        
         return FileInfo(
             file_id=file_id,
-            filename=file.filename,
+            filename=filename,
             rows=len(df),
             columns=len(df.columns),
             size=file_size,
-            file_type=file_ext[1:]  # Remove dot
+            file_type=file_type
         )
     
-    def _load_dataframe(self, file_path: str) -> pd.DataFrame:
-        """Load DataFrame from file"""
+    def _load_dataframe(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load DataFrame from file, optionally parsing only the given columns"""
         file_ext = os.path.splitext(file_path)[1].lower()
         
         # Common representations of missing values
@@ -52,33 +45,47 @@ class FileHandler:
         if file_ext == '.csv':
             # Read CSV with comprehensive NA handling
             df = pd.read_csv(
-                file_path, 
+                file_path,
                 na_values=na_values, 
                 keep_default_na=True,
-                skipinitialspace=True  # Remove leading spaces
+                skipinitialspace=True,  # Remove leading spaces
+                usecols=columns
             )
-            # Also treat empty strings as NaN after reading
-            df = df.replace(r'^\s*$', np.nan, regex=True)
-            return df
+            return self._blank_to_nan(df)
         elif file_ext in ['.xlsx', '.xls']:
-            return pd.read_excel(file_path, na_values=na_values, keep_default_na=True)
+            return pd.read_excel(file_path, na_values=na_values, keep_default_na=True, usecols=columns)
         else:
             raise ValueError(f"Unsupported file type: {file_ext}")
     
-    def load_dataframe(self, file_id: str) -> pd.DataFrame:
-        """Load DataFrame by file ID - prefers processed version if available"""
+    @staticmethod
+    def _blank_to_nan(df: pd.DataFrame) -> pd.DataFrame:
+        """Treat empty/whitespace-only strings as NaN (only text columns can hold them)"""
+        text_cols = df.select_dtypes(include=['object', 'string']).columns
+        if len(text_cols) > 0:
+            df[text_cols] = df[text_cols].replace(r'^\s*$', np.nan, regex=True)
+        return df
+    
+    def get_current_file_path(self, file_id: str) -> str:
+        """Get the path load_dataframe reads - processed version if available, else original"""
+        processed_path = os.path.join(self.temp_dir, f"{file_id}_processed.csv")
+        if os.path.exists(processed_path):
+            return processed_path
+        return self._get_file_path(file_id)
+    
+    def load_dataframe(self, file_id: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load DataFrame by file ID - prefers processed version if available; columns limits what is parsed"""
         # Check if processed file exists first
         processed_path = os.path.join(self.temp_dir, f"{file_id}_processed.csv")
         if os.path.exists(processed_path):
             print(f"Loading PROCESSED file: {processed_path}")
-            return self._load_dataframe(processed_path)
+            return self._load_dataframe(processed_path, columns)
         
         # Otherwise load original file
         file_path = self._get_file_path(file_id)
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_id}")
         print(f"Loading ORIGINAL file: {file_path}")
-        return self._load_dataframe(file_path)
+        return self._load_dataframe(file_path, columns)
     
     def _get_file_path(self, file_id: str) -> str:
         """Get file path by ID"""
@@ -90,40 +97,30 @@ class FileHandler:
     
     async def delete_file(self, file_id: str):
         """Delete file by ID"""
-        file_path = self._get_file_path(file_id)
-        os.remove(file_path)
-        
-        # Also delete processed file if exists
-        processed_path = os.path.join(self.temp_dir, f"{file_id}_processed.csv")
-        if os.path.exists(processed_path):
-            os.remove(processed_path)
+        # Delete processed file first so it goes even if the original is already gone
+        Path(self.temp_dir, f"{file_id}_processed.csv").unlink(missing_ok=True)
+        Path(self._get_file_path(file_id)).unlink(missing_ok=True)
     
     def save_processed_dataframe(self, file_id: str, df: pd.DataFrame) -> str:
         """Save processed DataFrame and return file path"""
         file_path = os.path.join(self.temp_dir, f"{file_id}_processed.csv")
         
-        # Log before saving
-        print(f"\n--- SAVING PROCESSED FILE ---")
-        print(f"DataFrame shape: {df.shape}")
-        print(f"Missing values per column BEFORE save:")
-        print(df.isna().sum())
-        print(f"Total missing values: {df.isna().sum().sum()}")
-        
-        # Save with proper NA handling - don't write NaN as string
-        df.to_csv(file_path, index=False, na_rep='')
-        print(f"Saved to: {file_path}")
-        
-        # Verify by reading back
-        print(f"\n--- VERIFYING SAVED FILE ---")
-        df_verify = self._load_dataframe(file_path)
-        print(f"Loaded shape: {df_verify.shape}")
-        print(f"Missing values per column AFTER save:")
-        print(df_verify.isna().sum())
-        print(f"Total missing values: {df_verify.isna().sum().sum()}")
-        print(f"--- VERIFICATION COMPLETE ---\n")
+        # Save with proper NA handling - don't write NaN as string.
+        # Write through a 1 MiB buffer to a temp file, then swap it in atomically so
+        # concurrent downloads/analyses never read a half-written file
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as f:
+            df.to_csv(f, index=False, na_rep='')
+        os.replace(tmp_path, file_path)
+        print(f"Saved processed file {file_path}: shape={df.shape}, missing={int(df.isna().sum().sum())}")
         
         return file_path
     
+    def stat_processed_file(self, file_id: str) -> Tuple[str, os.stat_result]:
+        """Get processed file path and its stat result with a single stat call"""
+        file_path = os.path.join(self.temp_dir, f"{file_id}_processed.csv")
+        return file_path, os.stat(file_path)
+    
     def get_processed_file_path(self, file_id: str) -> str:
         """Get processed file path"""
         file_path = os.path.join(self.temp_dir, f"{file_id}_processed.csv")
@@ -9,6 +9,10 @@ def init_db():
     """Create all database tables"""
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add any indexes they are missing
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     print("✓ Database tables created successfully!")
     print("  - users")
     print("  - otps")
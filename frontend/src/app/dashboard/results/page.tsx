@@ -151,7 +151,7 @@ export default function ResultsPage() {
             alert(`Imbalanced data fix applied successfully!`);
         } catch (error: any) {
             console.error('Imbalanced fix error:', error);
-            alert(error.response?.data?.detail || 'Failed to apply imbalanced data fix');
+            alert(error.response?.data?.detail || error.message || 'Failed to apply imbalanced data fix');
             throw error;
         }
     };
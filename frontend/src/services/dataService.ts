@@ -50,16 +50,65 @@ export const fixAllIssues = async (fileId: string): Promise<PreprocessResponse>
   return response.data;
 };
 
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_MAX_BACKOFF_MS = 10000;
+// Matches the access token lifetime (ACCESS_TOKEN_EXPIRE_MINUTES) and the backend job timeout
+const JOB_POLL_WINDOW_MS = 15 * 60 * 1000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 export const fixImbalancedData = async (
   fileId: string,
   targetColumn: string,
   method: string
 ): Promise<any> => {
+  // The fix runs as a background job; poll until it finishes
   const response = await apiClient.post(
     `/api/preprocess/${fileId}/fix-imbalanced`,
     { target_column: targetColumn, method }
   );
-  return response.data;
+  const jobId = response.data.job_id;
+
+  const deadline = Date.now() + JOB_POLL_WINDOW_MS;
+  let delay = JOB_POLL_INTERVAL_MS;
+  let refreshed = false;
+
+  while (Date.now() < deadline) {
+    await sleep(delay);
+    let job;
+    try {
+      // Cookies go along so a refreshed access token cookie is used
+      job = await apiClient.get(`/api/preprocess/jobs/${jobId}`, { withCredentials: true });
+    } catch (error: any) {
+      const status = error.response?.status;
+      if (status === 401 && !refreshed) {
+        // Access token expired mid-job: refresh once, then keep polling
+        refreshed = true;
+        try {
+          await apiClient.post('/api/auth/refresh', null, { withCredentials: true });
+        } catch {
+          throw new Error('Session expired while the imbalanced data fix was running; please log in again');
+        }
+        delay = JOB_POLL_INTERVAL_MS;
+        continue;
+      }
+      if (status === undefined || status >= 500) {
+        // Network error or server hiccup: the job may still be running, so back off and retry
+        delay = Math.min(delay * 2, JOB_POLL_MAX_BACKOFF_MS);
+        continue;
+      }
+      throw error;
+    }
+
+    delay = JOB_POLL_INTERVAL_MS;
+    if (job.data.status === 'completed') {
+      return job.data.result;
+    }
+    if (job.data.status === 'failed') {
+      throw new Error(job.data.error || 'Imbalanced data fix failed');
+    }
+  }
+  throw new Error('Imbalanced data fix timed out');
 };
 
 export const downloadFile = (fileId: string): string => {